@@ -0,0 +1,23 @@
+# =============================================================
+# APP SETTINGS (key/value di SQLite)
+# =============================================================
+
+
+class SettingsStore:
+
+    def __init__(self, db):
+        self.db = db
+
+    def get(self, key: str, default=None):
+        conn = self.db.connection()
+        row = conn.execute(
+            "SELECT value FROM settings WHERE key=?", (key,)
+        ).fetchone()
+        return row[0] if row else default
+
+    def set(self, key: str, value):
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO settings (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value=excluded.value
+            """, (key, None if value is None else str(value)))
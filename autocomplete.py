@@ -0,0 +1,116 @@
+import re
+from functools import lru_cache
+
+# =============================================================
+# AUTOCOMPLETE (PREFIX INDEX)
+# =============================================================
+# Semua prefix dari setiap kandidat dihitung sekali di depan, jadi
+# satu ketikan = satu lookup dict. Untuk jam, tiap nilai "HH:MM"
+# juga diindeks dalam bentuk longgar ("H:MM", "HHMM", "HMM"), dan
+# input "9.3" / "9,3" / "9 3" dinormalisasi jadi "9:3".
+#
+# Autocomplete men-debounce <KeyRelease> dan hanya mengirim list
+# values ke Tk kalau hasilnya benar-benar berubah.
+
+MAX_PREFIX = 24  # prefix teks lebih panjang difilter dari hasil prefix ini
+NAV_KEYS = {"Up", "Down", "Left", "Right", "Return", "KP_Enter", "Escape", "Tab", "ISO_Left_Tab"}
+
+_TIME_SEPARATORS = re.compile(r"[.,;\s]+")
+
+
+class PrefixIndex:
+
+    def __init__(self, values, forms, normalize, max_prefix=MAX_PREFIX):
+        """
+        forms: callable value -> iterable of indexed spellings
+        normalize: callable typed_text -> lookup key
+        """
+        self.values = tuple(values)
+        self.normalize = normalize
+        self.max_prefix = max_prefix
+        self._forms = {}
+        index = {}
+        for v in self.values:
+            keys = self._forms[v] = tuple(dict.fromkeys(forms(v)))
+            for key in keys:
+                for n in range(1, min(len(key), max_prefix) + 1):
+                    index.setdefault(key[:n], {})[v] = None
+        # dict → tuple sekali di sini; lookup selalu mengembalikan objek yang sama
+        self._index = {k: tuple(v) for k, v in index.items()}
+
+    def lookup(self, typed):
+        """Candidates in original order; all values for empty input, () for no match."""
+        key = self.normalize(typed)
+        if not key:
+            return self.values
+        if len(key) <= self.max_prefix:
+            return self._index.get(key, ())
+        return tuple(
+            v for v in self._index.get(key[:self.max_prefix], ())
+            if any(f.startswith(key) for f in self._forms[v])
+        )
+
+
+def time_forms(value):
+    hh, mm = value.split(":")
+    h = str(int(hh))
+    return value, f"{h}:{mm}", hh + mm, h + mm
+
+
+def normalize_time(typed):
+    return _TIME_SEPARATORS.sub(":", typed.strip())
+
+
+@lru_cache(maxsize=None)
+def time_index(step=5):
+    """Shared index over the 24h time list (built once per step)."""
+    values = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, step)]
+    return PrefixIndex(values, time_forms, normalize_time)
+
+
+def text_forms(value):
+    # seluruh teks + setiap awal kata ("fix" cocok dengan "Bug fix urgent")
+    words = value.lower().split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def normalize_text(typed):
+    return " ".join(typed.lower().split())
+
+
+def text_index(values):
+    return PrefixIndex(dict.fromkeys(v for v in values if v and v.strip()), text_forms, normalize_text)
+
+
+class Autocomplete:
+
+    def __init__(self, cb, index, delay_ms=120):
+        """cb: ttk.Combobox; index: PrefixIndex (can be swapped with set_index)."""
+        self.cb = cb
+        self.index = index
+        self.delay_ms = delay_ms
+        self.shown = None
+        self._pending = None
+        self.set_values(index.values)
+        cb.bind("<KeyRelease>", self.on_key)
+
+    def set_index(self, index):
+        self.index = index
+        self.set_values(index.lookup(self.cb.get()) or index.values)
+
+    def set_values(self, values):
+        if values is self.shown or values == self.shown:
+            return
+        self.shown = values
+        self.cb["values"] = values
+
+    def on_key(self, event):
+        if event.keysym in NAV_KEYS:
+            return
+        if self._pending is not None:
+            self.cb.after_cancel(self._pending)
+        self._pending = self.cb.after(self.delay_ms, self.update)
+
+    def update(self):
+        self._pending = None
+        self.set_values(self.index.lookup(self.cb.get()) or self.index.values)
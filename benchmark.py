@@ -0,0 +1,285 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from timesheet_core import TimesheetCore
+from sync_worker import SyncWorker
+from sheet_backend import LocalSheetSync
+from duration_batch import benchmark as duration_benchmark
+
+# =============================================================
+# BENCHMARK SUITE
+# =============================================================
+# Membuat database sintetis (1..20 tahun, satu / banyak karyawan)
+# lalu mengukur operasi utama: load bulan, save, export range
+# penuh, report, build payload sync dan pull / rekonsiliasi (ke
+# LocalSheetSync di memori, tanpa jaringan).
+# Hasil ditulis sebagai JSON; --compare membandingkan dengan hasil
+# versi sebelumnya dan keluar dengan status 1 kalau ada regresi.
+#
+#   python benchmark.py --years 1 5 20 --employees 3 --out bench.json
+#   python benchmark.py --years 5 --compare bench.json
+
+REGRESSION_RATIO = 1.25  # lebih lambat dari ini = regresi
+NOISE_FLOOR_S = 0.0005   # selisih di bawah ini dianggap noise
+TIMES = [f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, 5)]
+REASONS = ["Deadline proyek", "Bug fix urgent", "Support implementasi", "Maintenance sistem"]
+
+
+# =============================================================
+# DATA SINTETIS
+# =============================================================
+def synthetic_row(rnd):
+    """One plausible workday in ENTRY_FIELDS order."""
+    start = rnd.randrange(7 * 12, 10 * 12)          # 07:00-09:55
+    lunch = start + rnd.randrange(40, 56)           # ±4 jam kemudian
+    end = lunch + 12 + rnd.randrange(40, 56)
+    row = [TIMES[start], TIMES[lunch], TIMES[lunch + 12], TIMES[min(end, 287)]]
+    if rnd.random() < 0.3:
+        lm = min(end + rnd.randrange(6, 12), 280)
+        ls = (lm + rnd.randrange(12, 48)) % 288     # bisa lewat tengah malam
+        row += [TIMES[lm], TIMES[ls], rnd.choice(REASONS), "Lembur sintetis", ""]
+    else:
+        row += ["", "", "", "", ""]
+    return tuple(row)
+
+
+def generate_db(path, years=1, employees=1, start_year=2005, seed=1):
+    """
+    Create a migrated database with `years` of weekday entries for
+    `employees` employees. Returns (TimesheetCore, [Employee]).
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    core = TimesheetCore(path)
+    people = [core.current_employee()]
+    for i in range(1, employees):
+        people.append(core.employees.add(f"Karyawan {i + 1}", f"Benchmark {i + 1}"))
+
+    rnd = random.Random(seed)
+    first = date(start_year, 1, 1)
+    last = date(start_year + years - 1, 12, 31)
+    for employee in people:
+        repo = core.repo(employee)
+        batch = []
+        d = first
+        while d <= last:
+            if d.weekday() < 5:
+                batch.append((d.isoformat(), synthetic_row(rnd)))
+            d += timedelta(days=1)
+        repo.save_many(batch, run_hooks=False)
+    return core, people
+
+
+# =============================================================
+# PENGUKURAN
+# =============================================================
+def measure(fn, repeat=5, setup=None, number=1, warmup=1):
+    """
+    Time fn() per call: `repeat` samples of `number` calls each, after
+    `warmup` untimed calls (lazy imports, first-use caches).
+    setup() runs before every sample and is not timed.
+    """
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - t0) / number)
+    return {
+        "repeat": repeat,
+        "number": number,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "mean_s": statistics.fmean(times) if hasattr(statistics, "fmean") else statistics.mean(times),
+    }
+
+
+def run_dataset(workdir, years, employees, repeat=5, seed=1, start_year=2005):
+    path = os.path.join(workdir, f"bench_y{years}_e{employees}.db")
+    t0 = time.perf_counter()
+    core, people = generate_db(path, years, employees, start_year, seed)
+    generate_s = time.perf_counter() - t0
+
+    employee = people[0]
+    repo = core.repo(employee)
+    start, end = f"{start_year}-01-01", f"{start_year + years - 1}-12-31"
+    last_year = start_year + years - 1
+    rnd = random.Random(seed)
+    months = [(rnd.randrange(start_year, last_year + 1), rnd.randrange(1, 13)) for _ in range(repeat)]
+    results = {}
+
+    # load bulan: dingin (tanpa cache) dan hangat (dari LRU cache)
+    it = itertools.cycle(months)
+    uncached = core.repo(employee)
+    uncached.cache = None
+    results["month_load_cold"] = measure(lambda: uncached.load_month(*next(it)), repeat, number=20)
+    results["month_load_cached"] = measure(lambda: repo.load_month(*months[0]), repeat, number=1000)
+
+    # save satu hari (upsert + outbox + write-through cache)
+    row = synthetic_row(rnd)
+    save_days = itertools.cycle([(date(last_year, 6, 1) + timedelta(days=i)).isoformat() for i in range(100)])
+    results["save"] = measure(lambda: repo.save(next(save_days), row), repeat, number=20)
+
+    results["report_months"] = measure(lambda: repo.totals(start, end, "month"), repeat, number=10)
+
+    out = os.path.join(workdir, "export.xlsx")
+    export_repeat = max(2, repeat // 2)
+    results["export_summary_full"] = measure(
+        lambda: core.export(employee, out, start, end, "summary"), export_repeat
+    )
+    results["export_daily_1y"] = measure(
+        lambda: core.export(employee, out, f"{last_year}-01-01", end, "daily"), export_repeat, warmup=0
+    )
+
+    # build payload sync satu bulan penuh (sync_state dikosongkan → semua hari dirty)
+    sheet = LocalSheetSync(None, employee.spreadsheet)
+    core.sheet_sync = lambda e: sheet
+
+    def reset_sync_state():
+        with core.db.transaction() as conn:
+            conn.execute("DELETE FROM sync_state")
+
+    def sync_month():
+        worker = SyncWorker(lambda: core.sheet_sync(employee))
+        core.prepare_sync(worker, employee, last_year, 3)
+        worker.run()
+
+    results["sync_month_payloads"] = measure(sync_month, repeat, setup=reset_sync_state, number=1)
+    # satu bacaan sheet + diff hash, tanpa menulis ke database
+    results["pull_month"] = measure(
+        lambda: core.pull_month(employee, last_year, 3, apply=False), repeat, number=10
+    )
+
+    entries = core.db.connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+    core.close()
+    return {
+        "years": years,
+        "employees": employees,
+        "entries": entries,
+        "db_bytes": os.path.getsize(path),
+        "generate_s": generate_s,
+        "results": results,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_suite(years_list=(1, 5, 20), employees=1, repeat=5, seed=1, duration_rows=100_000, workdir=None):
+    keep = workdir is not None
+    workdir = workdir or tempfile.mkdtemp(prefix="timesheet-bench-")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        datasets = {
+            f"y{years}_e{employees}": run_dataset(workdir, years, employees, repeat, seed)
+            for years in years_list
+        }
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "datasets": datasets,
+        "durations": duration_benchmark(duration_rows, seed) if duration_rows else None,
+    }
+
+
+# =============================================================
+# PERBANDINGAN
+# =============================================================
+def compare(old, new, ratio=REGRESSION_RATIO, floor=NOISE_FLOOR_S):
+    """
+    Yield (dataset, name, old_s, new_s, factor, regressed) using median
+    times; slower by less than `floor` seconds never counts as regressed.
+    """
+    for key, ds in new["datasets"].items():
+        base = old.get("datasets", {}).get(key)
+        if not base:
+            continue
+        for name, res in ds["results"].items():
+            prev = base["results"].get(name)
+            if not prev or prev["median_s"] <= 0:
+                continue
+            factor = res["median_s"] / prev["median_s"]
+            slower = res["median_s"] - prev["median_s"]
+            yield key, name, prev["median_s"], res["median_s"], factor, factor > ratio and slower > floor
+
+
+def print_results(report):
+    for key, ds in report["datasets"].items():
+        print(f"{key}: {ds['entries']} entries, {ds['db_bytes'] / 1e6:.1f} MB, generate {ds['generate_s']:.2f}s")
+        for name, res in ds["results"].items():
+            print(f"  {name:22} median {res['median_s'] * 1000:9.2f} ms   min {res['min_s'] * 1000:9.2f} ms")
+    if report.get("durations"):
+        print("durations: " + ", ".join(
+            f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}" for k, v in report["durations"].items()
+        ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Timesheet benchmark suite")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 20])
+    parser.add_argument("--employees", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--duration-rows", type=int, default=100_000, help="0 = lewati benchmark durasi")
+    parser.add_argument("--workdir", help="simpan database sintetis di sini (default: folder sementara)")
+    parser.add_argument("--out", help="file JSON hasil (default: bench-<waktu>.json)")
+    parser.add_argument("--compare", help="JSON hasil sebelumnya; status 1 kalau ada regresi")
+    parser.add_argument("--ratio", type=float, default=REGRESSION_RATIO)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.years, args.employees, args.repeat, args.seed, args.duration_rows, args.workdir)
+    out = args.out or f"bench-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print_results(report)
+    print(f"hasil: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        regressed = False
+        for key, name, prev, cur, factor, bad in compare(old, report, args.ratio):
+            regressed |= bad
+            print(f"{'REGRESI' if bad else 'ok':7} {key} {name}: {prev * 1000:.2f} -> {cur * 1000:.2f} ms ({factor:.2f}x)")
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
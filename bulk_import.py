@@ -0,0 +1,257 @@
+import csv
+import os
+from datetime import date, datetime, time
+from functools import lru_cache
+
+from entry_repository import ENTRY_FIELDS
+
+# =============================================================
+# BULK IMPORT (CSV / XLSX)
+# =============================================================
+# File dibaca sebagai stream (csv.reader / openpyxl read_only), baris
+# divalidasi satu per satu lalu di-upsert per batch dengan
+# executemany dalam satu transaksi. Memori tetap kecil berapa pun
+# jumlah barisnya; baris yang ditolak ditulis ke file laporan.
+#
+# Layout yang dikenali:
+#   - tabel dengan header (CSV, atau sheet XLSX): label seperti di
+#     export "satu baris per tanggal" atau nama kolom DB
+#   - sheet template harian hasil export "satu sheet per tanggal"
+#     (baris pertama "Identitas")
+
+BATCH_SIZE = 5000
+MAX_SAMPLE = 50  # penolakan yang disimpan di memori untuk ditampilkan
+
+TIME_FIELDS = ENTRY_FIELDS[:6]
+REJECT_FIELDS = ("entry_date",) + ENTRY_FIELDS
+
+# header / label (sudah dinormalisasi) -> kolom entries
+HEADER_ALIASES = {
+    **{f: f for f in ENTRY_FIELDS},
+    "entry_date": "entry_date",
+    "tanggal": "entry_date",
+    "tanggal_lembur": "entry_date",
+    "jam_mulai_lembur": "lembur_mulai",
+    "jam_selesai_lembur": "lembur_selesai",
+    "alasan": "alasan_lembur",
+    "deskripsi": "deskripsi_lembur",
+    "deskripsi_pekerjaan": "deskripsi_lembur",
+    "catatan": "note",
+    "catatan_tambahan": "note",
+}
+
+
+class ImportReport:
+
+    def __init__(self):
+        self.read = 0
+        self.imported = 0
+        self.rejected = 0
+        self.skipped = 0  # tanggal tanpa isi (hari kosong hasil export)
+        self.sample = []  # [(source, line, reason)] maks. MAX_SAMPLE
+        self.rejects_path = None
+
+    def reject(self, source, line, reason):
+        self.rejected += 1
+        if len(self.sample) < MAX_SAMPLE:
+            self.sample.append((source, line, reason))
+
+    def summary(self):
+        text = (
+            f"{self.imported} baris diimpor, {self.skipped} kosong dilewati, "
+            f"{self.rejected} ditolak (dari {self.read})"
+        )
+        if self.rejected and self.rejects_path:
+            text += f"\nDetail penolakan: {self.rejects_path}"
+        return text
+
+
+def header_key(label):
+    return "_".join(str(label or "").strip().lower().split())
+
+
+# =============================================================
+# PARSE
+# =============================================================
+def iter_csv(path):
+    """Yield (source, line, {field: raw}) from a CSV with a header row."""
+    name = os.path.basename(path)
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from iter_table(name, csv.reader(f, dialect))
+
+
+def iter_table(source, rows, first_line=1):
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    fields = [HEADER_ALIASES.get(header_key(h)) for h in header]
+    if "entry_date" not in fields:
+        raise ValueError(f"{source}: kolom Tanggal tidak ditemukan di header")
+
+    for line, row in enumerate(rows, start=first_line + 1):
+        if row is None or all(v in (None, "") for v in row):
+            continue
+        yield source, line, {f: v for f, v in zip(fields, row) if f}
+
+
+def iter_daily_sheet(source, rows):
+    """One record from a daily template sheet (label in col A, value in col B)."""
+    record = {}
+    for row in rows:
+        if not row:
+            continue
+        field = HEADER_ALIASES.get(header_key(row[0]))
+        if field and field not in record:
+            record[field] = row[1] if len(row) > 1 else None
+    if record:
+        yield source, 1, record
+
+
+def iter_xlsx(path):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            first = next(rows, None)
+            if not first:
+                continue
+            if header_key(first[0]) == "identitas":
+                yield from iter_daily_sheet(ws.title, rows)
+            else:
+                yield from iter_table(ws.title, _prepend(first, rows))
+    finally:
+        wb.close()
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def iter_records(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return iter_csv(path)
+    if ext in (".xlsx", ".xlsm"):
+        return iter_xlsx(path)
+    raise ValueError(f"Format tidak didukung: {ext} (pakai .csv atau .xlsx)")
+
+
+# =============================================================
+# VALIDASI
+# =============================================================
+def clean_date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value or "").strip()
+    try:
+        return date.fromisoformat(text[:10]).isoformat()
+    except ValueError:
+        raise ValueError(f"tanggal tidak valid: {text!r}")
+
+
+def clean_time(field, value):
+    """Normalize to 'HH:MM' (or ''), same h:m rules as to_minutes."""
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, time)):
+        return value.strftime("%H:%M")
+    if isinstance(value, float) and 0 <= value < 1:
+        # sel Excel berformat waktu tanpa style: pecahan hari
+        minutes = int(round(value * 24 * 60)) % (24 * 60)
+        return f"{minutes // 60:02d}:{minutes % 60:02d}"
+    try:
+        return _clean_time_text(str(value).strip())
+    except ValueError as e:
+        raise ValueError(f"{field}: {e}")
+
+
+@lru_cache(maxsize=4096)
+def _clean_time_text(text):
+    # teks jam berulang terus di file besar → di-cache
+    if not text:
+        return ""
+    try:
+        h, m = map(int, text.split(":")[:2])
+    except ValueError:
+        raise ValueError(f"jam tidak valid {text!r}")
+    if not (0 <= h < 24 and 0 <= m < 60):
+        raise ValueError(f"jam di luar rentang {text!r}")
+    return f"{h:02d}:{m:02d}"
+
+
+def clean_record(record):
+    """Raw {field: value} -> (entry_date, values in ENTRY_FIELDS order)."""
+    d = clean_date(record.get("entry_date"))
+    values = [clean_time(f, record.get(f)) for f in TIME_FIELDS]
+    for f in ENTRY_FIELDS[6:]:
+        v = record.get(f)
+        values.append("" if v is None else str(v).strip())
+    return d, tuple(values)
+
+
+# =============================================================
+# IMPORT
+# =============================================================
+def import_file(path, repo, batch_size=BATCH_SIZE, progress=None,
+                rejects_path=None, cancelled=None, run_hooks=False):
+    """
+    Stream `path` into repo (EntryRepository of the target employee).
+    progress: optional callable(rows_read)
+    rejects_path: CSV for rejected rows (default: <path>.rejected.csv,
+    only created when something is rejected)
+    cancelled: optional threading.Event; batches already committed stay
+    run_hooks: queue imported days for Google Sheet sync (off by default)
+    Returns an ImportReport.
+    """
+    report = ImportReport()
+    report.rejects_path = rejects_path or os.path.splitext(path)[0] + ".rejected.csv"
+    rejects_file = writer = None
+    batch = []
+
+    try:
+        for source, line, record in iter_records(path):
+            if cancelled is not None and cancelled.is_set():
+                break
+            report.read += 1
+            try:
+                d, values = clean_record(record)
+            except ValueError as e:
+                report.reject(source, line, str(e))
+                if writer is None:
+                    rejects_file = open(report.rejects_path, "w", newline="", encoding="utf-8")
+                    writer = csv.writer(rejects_file)
+                    writer.writerow(["sumber", "baris", "alasan", *REJECT_FIELDS])
+                writer.writerow([source, line, str(e), *(record.get(f) for f in REJECT_FIELDS)])
+            else:
+                # hanya tanggal: jangan buat / kosongkan entry
+                if any(values):
+                    batch.append((d, values))
+                else:
+                    report.skipped += 1
+
+            if len(batch) >= batch_size:
+                report.imported += repo.save_many(batch, run_hooks=run_hooks)
+                batch = []
+                if progress:
+                    progress(report.read)
+
+        report.imported += repo.save_many(batch, run_hooks=run_hooks)
+        if progress:
+            progress(report.read)
+    finally:
+        if rejects_file:
+            rejects_file.close()
+
+    return report
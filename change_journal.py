@@ -0,0 +1,95 @@
+import json
+from collections import namedtuple
+
+# =============================================================
+# CHANGE JOURNAL (AUDIT + UNDO / REDO)
+# =============================================================
+# Setiap save / delete lewat EntryRepository (dengan journal) menulis
+# satu baris entry_journal di transaksi yang sama: kolom yang berubah
+# beserta nilai lama & baru. Tabel hanya di-INSERT; undo / redo juga
+# baris baru (ref = id yang di-undo / di-redo), jadi riwayat lengkap.
+
+ACTION_CREATE = "create"
+ACTION_EDIT = "edit"
+ACTION_DELETE = "delete"
+ACTION_UNDO = "undo"
+ACTION_REDO = "redo"
+
+JournalEntry = namedtuple("JournalEntry", "id employee_id entry_date action before after ref changed_at")
+
+
+def _entry(r):
+    before = json.loads(r[4]) if r[4] is not None else None
+    after = json.loads(r[5]) if r[5] is not None else None
+    return JournalEntry(r[0], r[1], r[2], r[3], before, after, r[6], r[7])
+
+
+class ChangeJournal:
+
+    def __init__(self, db):
+        self.db = db
+
+    def record_in(self, conn, employee_id, d, action, before, after, ref=None):
+        """
+        before / after: {field: value} of the changed columns;
+        None = the row did not exist / was deleted. Returns the id.
+        """
+        cur = conn.execute("""
+            INSERT INTO entry_journal (employee_id, entry_date, action, before, after, ref)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            employee_id, d, action,
+            None if before is None else json.dumps(before, ensure_ascii=False),
+            None if after is None else json.dumps(after, ensure_ascii=False),
+            ref,
+        ))
+        return cur.lastrowid
+
+    def get(self, journal_id):
+        conn = self.db.connection()
+        r = conn.execute("""
+            SELECT id, employee_id, entry_date, action, before, after, ref, changed_at
+            FROM entry_journal WHERE id=?
+        """, (journal_id,)).fetchone()
+        return _entry(r) if r else None
+
+    def history(self, employee_id, start="0000-00-00", end="9999-99-99", limit=200):
+        """Newest first."""
+        conn = self.db.connection()
+        cur = conn.execute("""
+            SELECT id, employee_id, entry_date, action, before, after, ref, changed_at
+            FROM entry_journal
+            WHERE employee_id=? AND entry_date BETWEEN ? AND ?
+            ORDER BY id DESC
+            LIMIT ?
+        """, (employee_id, start, end, limit))
+        return [_entry(r) for r in cur]
+
+
+class UndoHistory:
+    """Undo / redo stacks of journal ids for one session (newest last)."""
+
+    def __init__(self, limit=200):
+        self.limit = limit
+        self.undo = []
+        self.redo = []
+
+    def push(self, journal_id):
+        """A new change: becomes undoable, the redo stack is dropped."""
+        self.undo.append(journal_id)
+        del self.undo[:-self.limit]
+        self.redo.clear()
+
+    def pop_undo(self):
+        if not self.undo:
+            return None
+        journal_id = self.undo.pop()
+        self.redo.append(journal_id)
+        return journal_id
+
+    def pop_redo(self):
+        if not self.redo:
+            return None
+        journal_id = self.redo.pop()
+        self.undo.append(journal_id)
+        return journal_id
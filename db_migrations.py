@@ -0,0 +1,236 @@
+import sqlite3
+
+from time_utils import MINUTE_FIELDS, minute_columns
+
+# =============================================================
+# MIGRASI SCHEMA (PRAGMA user_version)
+# =============================================================
+# Setiap fungsi di MIGRATIONS menaikkan schema satu versi.
+# Versi ke-N (1-based) = MIGRATIONS[N-1]. Jangan ubah migrasi
+# yang sudah dirilis, tambahkan yang baru di akhir list.
+
+
+def table_columns(conn, table):
+    return {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _v1_entries_table(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entries (
+            id INTEGER PRIMARY KEY,
+            entry_date TEXT NOT NULL,
+            jam_mulai_1 TEXT,
+            jam_selesai_1 TEXT,
+            jam_mulai_2 TEXT,
+            jam_selesai_2 TEXT,
+            lembur_mulai TEXT,
+            lembur_selesai TEXT,
+            alasan_lembur TEXT,
+            deskripsi_lembur TEXT,
+            note TEXT
+        )
+    """)
+
+    # database lama belum punya kolom ini
+    cols = table_columns(conn, "entries")
+    for col in ("alasan_lembur", "deskripsi_lembur"):
+        if col not in cols:
+            conn.execute(f"ALTER TABLE entries ADD COLUMN {col} TEXT")
+
+
+def _v2_unique_entry_date(conn):
+    # buang duplikat tanggal, simpan baris paling awal (id terkecil)
+    conn.execute("""
+        DELETE FROM entries
+        WHERE id NOT IN (SELECT MIN(id) FROM entries GROUP BY entry_date)
+    """)
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_entry_date
+        ON entries(entry_date)
+    """)
+
+
+def _v3_sync_state(conn):
+    if "updated_at" not in table_columns(conn, "entries"):
+        conn.execute("ALTER TABLE entries ADD COLUMN updated_at TEXT")
+
+    # hash payload terakhir yang berhasil di-push, per tanggal & spreadsheet
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_state (
+            spreadsheet TEXT NOT NULL,
+            entry_date TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            synced_at TEXT NOT NULL,
+            PRIMARY KEY (spreadsheet, entry_date)
+        )
+    """)
+
+
+def _v4_sync_outbox(conn):
+    # satu baris per (spreadsheet, tanggal) yang belum di-push;
+    # seq naik setiap kali tanggal itu diubah lagi
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS sync_outbox (
+            spreadsheet TEXT NOT NULL,
+            entry_date TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            queued_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            PRIMARY KEY (spreadsheet, entry_date)
+        )
+    """)
+
+
+def _v5_settings(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    """)
+
+
+def _v6_minute_columns(conn):
+    cols = table_columns(conn, "entries")
+    for col in MINUTE_FIELDS:
+        if col not in cols:
+            conn.execute(f"ALTER TABLE entries ADD COLUMN {col} INTEGER")
+
+    # backfill dari kolom teks, aturan sama dengan to_minutes
+    rows = conn.execute("""
+        SELECT id, jam_mulai_1, jam_selesai_1, jam_mulai_2, jam_selesai_2,
+               lembur_mulai, lembur_selesai
+        FROM entries
+    """).fetchall()
+    assignments = ", ".join(f"{c}=?" for c in MINUTE_FIELDS)
+    conn.executemany(
+        f"UPDATE entries SET {assignments} WHERE id=?",
+        [(*minute_columns(*r[1:]), r[0]) for r in rows]
+    )
+
+    # covering index untuk SUM ... GROUP BY per periode
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_date_minutes
+        ON entries(entry_date, work_minutes, overtime_minutes)
+    """)
+
+
+DEFAULT_EMPLOYEE_ID = 1
+DEFAULT_EMPLOYEE_NAME = "Refia Karsista"
+DEFAULT_SPREADSHEET = "AI META Timesheet"
+
+
+def _v7_employees(conn):
+    # data lama milik satu orang → jadi karyawan id 1
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS employees (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            spreadsheet TEXT NOT NULL
+        )
+    """)
+    conn.execute("""
+        INSERT OR IGNORE INTO employees (id, name, spreadsheet) VALUES (?, ?, ?)
+    """, (DEFAULT_EMPLOYEE_ID, DEFAULT_EMPLOYEE_NAME, DEFAULT_SPREADSHEET))
+
+    if "employee_id" not in table_columns(conn, "entries"):
+        conn.execute(f"""
+            ALTER TABLE entries ADD COLUMN employee_id INTEGER NOT NULL
+            DEFAULT {DEFAULT_EMPLOYEE_ID} REFERENCES employees(id)
+        """)
+
+    # unique & covering index sekarang per (karyawan, tanggal)
+    conn.execute("DROP INDEX IF EXISTS idx_entries_entry_date")
+    conn.execute("DROP INDEX IF EXISTS idx_entries_date_minutes")
+    conn.execute("""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_entries_employee_date
+        ON entries(employee_id, entry_date)
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entries_employee_minutes
+        ON entries(employee_id, entry_date, work_minutes, overtime_minutes)
+    """)
+
+    # outbox: spreadsheet ditentukan dari karyawan saat flush
+    conn.execute("""
+        CREATE TABLE sync_outbox_v7 (
+            employee_id INTEGER NOT NULL,
+            entry_date TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            queued_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            PRIMARY KEY (employee_id, entry_date)
+        )
+    """)
+    conn.execute(f"""
+        INSERT INTO sync_outbox_v7
+        SELECT {DEFAULT_EMPLOYEE_ID}, entry_date, MAX(seq), MAX(queued_at), 0, NULL
+        FROM sync_outbox GROUP BY entry_date
+    """)
+    conn.execute("DROP TABLE sync_outbox")
+    conn.execute("ALTER TABLE sync_outbox_v7 RENAME TO sync_outbox")
+
+
+def _v8_entry_journal(conn):
+    # append-only: undo / redo menulis baris baru, tidak pernah UPDATE/DELETE
+    # before / after: JSON {kolom: nilai} hanya kolom yang berubah;
+    # NULL = baris belum ada (before) / dihapus (after)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS entry_journal (
+            id INTEGER PRIMARY KEY,
+            employee_id INTEGER NOT NULL,
+            entry_date TEXT NOT NULL,
+            action TEXT NOT NULL,
+            before TEXT,
+            after TEXT,
+            ref INTEGER,
+            changed_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_entry_journal_employee_date
+        ON entry_journal(employee_id, entry_date)
+    """)
+
+
+MIGRATIONS = [
+    _v1_entries_table,
+    _v2_unique_entry_date,
+    _v3_sync_state,
+    _v4_sync_outbox,
+    _v5_settings,
+    _v6_minute_columns,
+    _v7_employees,
+    _v8_entry_journal,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection):
+    """
+    Bring the database up to SCHEMA_VERSION.
+    Each migration runs in its own transaction together with the
+    user_version bump; a current database runs no DDL at all.
+    """
+    version = schema_version(conn)
+    if version >= SCHEMA_VERSION:
+        return version
+
+    for target in range(version + 1, SCHEMA_VERSION + 1):
+        conn.execute("BEGIN")
+        try:
+            MIGRATIONS[target - 1](conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    return SCHEMA_VERSION
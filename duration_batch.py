@@ -0,0 +1,132 @@
+from array import array
+
+from time_utils import to_minutes, work_minutes, overtime_minutes
+
+# numpy opsional (fallback ke array('l')) dan baru di-import saat
+# kolomnya cukup panjang; untuk satu bulan versi Python lebih cepat
+# daripada biaya import numpy.
+np = None
+_numpy_checked = False
+NUMPY_MIN_ROWS = 2000
+
+
+def load_numpy():
+    """Import numpy on first use; returns the module or None."""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+# =============================================================
+# BATCH DURASI KERJA / LEMBUR
+# =============================================================
+# Versi kolom dari work_minutes / overtime_minutes: input enam kolom
+# menit (hasil to_minutes, 0 = kosong), output dua kolom menit.
+# Hasilnya harus identik dengan fungsi skalar di time_utils,
+# termasuk aturan lembur lewat tengah malam.
+
+DAY_MINUTES = 24 * 60
+
+
+def parse_column(times):
+    """Column of 'HH:MM' strings -> array('l') of to_minutes values."""
+    # nilai jam berulang terus (kelipatan 5 menit), jadi di-cache
+    cache = {}
+    out = array("l")
+    append = out.append
+    for t in times:
+        m = cache.get(t)
+        if m is None:
+            m = cache[t] = to_minutes(t)
+        append(m)
+    return out
+
+
+def _durations_numpy(a, b, c, d, lm, ls):
+    a, b, c, d, lm, ls = (np.asarray(x, dtype=np.int64) for x in (a, b, c, d, lm, ls))
+    work = np.where(b > a, b - a, 0) + np.where(d > c, d - c, 0)
+    end = np.where(ls < lm, ls + DAY_MINUTES, ls)
+    overtime = np.where((lm == 0) | (ls == 0), 0, end - lm)
+    return work, overtime
+
+
+def _durations_python(a, b, c, d, lm, ls):
+    work = array("l")
+    overtime = array("l")
+    w_append = work.append
+    o_append = overtime.append
+    for a_, b_, c_, d_, l_, s_ in zip(a, b, c, d, lm, ls):
+        w_append((b_ - a_ if b_ > a_ else 0) + (d_ - c_ if d_ > c_ else 0))
+        if l_ == 0 or s_ == 0:
+            o_append(0)
+        else:
+            o_append((s_ + DAY_MINUTES if s_ < l_ else s_) - l_)
+    return work, overtime
+
+
+def batch_durations(a, b, c, d, lm, ls, use_numpy=None):
+    """
+    Work and overtime minutes for whole columns in one pass.
+    Inputs are equal-length minute columns (list, array or ndarray).
+    use_numpy: None = use numpy when installed and len >= NUMPY_MIN_ROWS.
+    Returns (work, overtime) as ndarrays (numpy) or array('l').
+    """
+    if use_numpy is None:
+        use_numpy = len(a) >= NUMPY_MIN_ROWS and load_numpy() is not None
+    if use_numpy:
+        if load_numpy() is None:
+            raise ImportError("numpy is not installed")
+        return _durations_numpy(a, b, c, d, lm, ls)
+    return _durations_python(a, b, c, d, lm, ls)
+
+
+def durations_for_rows(rows, use_numpy=None):
+    """
+    rows: entries in ENTRY_FIELDS order (None for days without entry).
+    Returns (work, overtime) minute columns aligned with rows.
+    """
+    rows = [r or ("",) * 6 for r in rows]
+    cols = [parse_column([r[i] for r in rows]) for i in range(6)]
+    return batch_durations(*cols, use_numpy=use_numpy)
+
+
+# =============================================================
+# BENCHMARK (skalar vs batch)
+#   python duration_batch.py [jumlah_baris]
+# =============================================================
+def benchmark(n=100_000, seed=1):
+    import random
+    import time
+
+    rnd = random.Random(seed)
+    times = [""] + [f"{h:02d}:{m:02d}" for h in range(24) for m in range(0, 60, 5)]
+    rows = [tuple(rnd.choice(times) for _ in range(6)) for _ in range(n)]
+
+    t0 = time.perf_counter()
+    scalar = [
+        (work_minutes(*r[:4]), overtime_minutes(*r[4:6]))
+        for r in rows
+    ]
+    t_scalar = time.perf_counter() - t0
+
+    result = {"rows": n, "scalar_s": t_scalar}
+    modes = [("python", False)] + ([("numpy", True)] if load_numpy() is not None else [])
+    for name, flag in modes:
+        t0 = time.perf_counter()
+        work, overtime = durations_for_rows(rows, use_numpy=flag)
+        result[f"{name}_s"] = time.perf_counter() - t0
+        if [(int(w), int(o)) for w, o in zip(work, overtime)] != scalar:
+            raise AssertionError(f"{name} batch does not match scalar results")
+    return result
+
+
+if __name__ == "__main__":
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for k, v in benchmark(n).items():
+        print(f"{k:10} {v:.4f}" if isinstance(v, float) else f"{k:10} {v}")
@@ -0,0 +1,379 @@
+import calendar
+from collections import namedtuple
+from datetime import date
+
+from time_utils import MINUTE_FIELDS, minute_columns
+from db_migrations import DEFAULT_EMPLOYEE_ID
+from change_journal import ACTION_CREATE, ACTION_EDIT, ACTION_DELETE, ACTION_UNDO, ACTION_REDO
+
+ENTRY_FIELDS = (
+    "jam_mulai_1", "jam_selesai_1", "jam_mulai_2", "jam_selesai_2",
+    "lembur_mulai", "lembur_selesai",
+    "alasan_lembur", "deskripsi_lembur", "note",
+)
+
+
+def month_days(year: int, month: int):
+    _, ndays = calendar.monthrange(year, month)
+    return [
+        date(year, month, i).strftime("%Y-%m-%d")
+        for i in range(1, ndays + 1)
+    ]
+
+
+def check_date(d: str):
+    """ValueError unless `d` is a 'YYYY-MM-DD' date (the form entry_date is stored in)."""
+    try:
+        ok = date.fromisoformat(d).isoformat() == d
+    except (TypeError, ValueError):
+        ok = False
+    if not ok:
+        raise ValueError(f"tanggal tidak valid: {d!r} (format YYYY-MM-DD)")
+
+
+ENTRY_COLUMNS = ENTRY_FIELDS + MINUTE_FIELDS
+
+# satu teks SQL → satu prepared statement di cache koneksi
+UPSERT_ENTRY = f"""
+    INSERT INTO entries (employee_id, entry_date, {", ".join(ENTRY_COLUMNS)}, updated_at)
+    VALUES (?, ?{",?" * len(ENTRY_COLUMNS)}, CURRENT_TIMESTAMP)
+    ON CONFLICT(employee_id, entry_date) DO UPDATE SET
+    {", ".join(f"{f}=excluded.{f}" for f in ENTRY_COLUMNS)},
+    updated_at=excluded.updated_at
+"""
+
+# kolom yang ditambah lewat ALTER (alasan / deskripsi) NULL di baris lama;
+# dibaca sebagai "" supaya hash payload sama dengan isi sheet
+ENTRY_SELECT = ", ".join(f"IFNULL({f}, '')" for f in ENTRY_FIELDS)
+
+SELECT_ENTRY = f"""
+    SELECT {ENTRY_SELECT} FROM entries
+    WHERE employee_id=? AND entry_date=?
+"""
+
+PERIOD_KEYS = {
+    "month": "substr(entry_date, 1, 7)",
+    "quarter": "substr(entry_date, 1, 4) || '-Q' || ((CAST(substr(entry_date, 6, 2) AS INTEGER) + 2) / 3)",
+    "year": "substr(entry_date, 1, 4)",
+}
+
+
+# =============================================================
+# MONTH MODEL
+# =============================================================
+class MonthModel:
+    """
+    In-memory snapshot of every entry in a list of days.
+    Days without an entry are kept in `days` but have no row.
+    """
+
+    def __init__(self, days, rows):
+        self.days = list(days)
+        self.rows = rows  # entry_date -> tuple in ENTRY_FIELDS order
+
+    def __contains__(self, d):
+        return d in self.rows
+
+    def __iter__(self):
+        for d in self.days:
+            yield d, self.rows.get(d)
+
+    def get(self, d):
+        return self.rows.get(d)
+
+    def entry(self, d):
+        row = self.rows.get(d)
+        if row is None:
+            return dict.fromkeys(ENTRY_FIELDS, "")
+        return dict(zip(ENTRY_FIELDS, row))
+
+
+# =============================================================
+# REPOSITORY
+# =============================================================
+class EntryRepository:
+    """
+    Entries of one employee. Every query filters on employee_id first so
+    it stays a range scan on the (employee_id, entry_date) index.
+    """
+
+    def __init__(self, db, write_hooks=(), employee_id=DEFAULT_EMPLOYEE_ID, cache=None, journal=None):
+        """
+        write_hooks: callables hook(conn, employee_id, dates) run inside the
+        same transaction as every save/delete (e.g. SyncOutbox.enqueue_in)
+        cache: optional MonthCache shared by all employees' repositories
+        journal: optional ChangeJournal; save / update / delete log their
+        changed columns to it in the same transaction
+        """
+        self.db = db
+        self.write_hooks = list(write_hooks)
+        self.employee_id = employee_id
+        self.cache = cache
+        self.journal = journal
+
+    def for_employee(self, employee_id):
+        return EntryRepository(self.db, self.write_hooks, employee_id, self.cache, self.journal)
+
+    def _run_write_hooks(self, conn, dates):
+        for hook in self.write_hooks:
+            hook(conn, self.employee_id, dates)
+
+    def load_range(self, start: str, end: str):
+        """
+        Load all entries with start <= entry_date <= end in one query.
+        Returns {entry_date: row}.
+        """
+        conn = self.db.connection()
+        cur = conn.execute(f"""
+            SELECT entry_date, {ENTRY_SELECT}
+            FROM entries
+            WHERE employee_id=? AND entry_date BETWEEN ? AND ?
+            ORDER BY entry_date
+        """, (self.employee_id, start, end))
+        rows = {}
+        for r in cur:
+            rows.setdefault(r[0], r[1:])
+        return rows
+
+    def iter_range(self, start: str, end: str):
+        """
+        Stream (entry_date, *ENTRY_FIELDS) rows for start..end ordered by
+        date, from a single query, without loading them all at once.
+        """
+        conn = self.db.connection()
+        cur = conn.execute(f"""
+            SELECT entry_date, {ENTRY_SELECT}
+            FROM entries
+            WHERE employee_id=? AND entry_date BETWEEN ? AND ?
+            ORDER BY entry_date
+        """, (self.employee_id, start, end))
+        try:
+            yield from cur
+        finally:
+            cur.close()  # generator ditinggal di tengah jalan
+
+    def load_dates(self, dates):
+        """Load scattered dates in one query. Returns {entry_date: row}."""
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+        conn = self.db.connection()
+        cur = conn.execute(f"""
+            SELECT entry_date, {ENTRY_SELECT}
+            FROM entries
+            WHERE employee_id=? AND entry_date IN ({",".join("?" * len(dates))})
+            ORDER BY entry_date
+        """, (self.employee_id, *dates))
+        rows = {}
+        for r in cur:
+            rows.setdefault(r[0], r[1:])
+        return rows
+
+    def load_days(self, days):
+        days = list(days)
+        if not days:
+            return MonthModel([], {})
+        return MonthModel(days, self.load_range(days[0], days[-1]))
+
+    def load_month(self, year: int, month: int):
+        if self.cache is None:
+            return self.load_days(month_days(year, month))
+
+        key = (self.employee_id, year, month)
+        model = self.cache.get(key)
+        if model is None:
+            version = self.cache.version(key)
+            model = self.load_days(month_days(year, month))
+            self.cache.put(key, model, version)
+        return model
+
+    def is_cached(self, year: int, month: int):
+        return self.cache is not None and self.cache.peek((self.employee_id, year, month)) is not None
+
+    def entry(self, d: str):
+        """Row for one day (None if empty); served from the month cache when enabled."""
+        check_date(d)
+        if self.cache is None:
+            return self.load_dates([d]).get(d)
+        return self.load_month(int(d[:4]), int(d[5:7])).get(d)
+
+    def _write_through(self, d, row):
+        if self.cache is None:
+            return
+
+        def apply(model):
+            rows = dict(model.rows)
+            if row is None:
+                rows.pop(d, None)
+            else:
+                rows[d] = row
+            return MonthModel(model.days, rows)
+
+        self.cache.update((self.employee_id, int(d[:4]), int(d[5:7])), apply)
+
+    def save(self, d: str, values):
+        """
+        Set the whole entry for `d`; `values` is a dict or sequence in
+        ENTRY_FIELDS order. See _write for what is actually written.
+        """
+        if isinstance(values, dict):
+            values = [values.get(f, "") for f in ENTRY_FIELDS]
+        return self._write(d, dict(zip(ENTRY_FIELDS, values)))
+
+    def update(self, d: str, fields):
+        """Set only the given {field: value}; other columns keep their value."""
+        return self._write(d, fields)
+
+    def revert(self, entry):
+        """Undo a JournalEntry of this employee: put its `before` back."""
+        return self._write(entry.entry_date, entry.before, ACTION_UNDO, entry.id)
+
+    def reapply(self, entry):
+        """Redo a JournalEntry of this employee: put its `after` back."""
+        return self._write(entry.entry_date, entry.after, ACTION_REDO, entry.id)
+
+    def _write(self, d, fields, action=ACTION_EDIT, ref=None, run_hooks=True):
+        """
+        fields: {field: value} to set, None = delete the row.
+        One transaction: read the stored row, write only the columns that
+        differ (minute columns only when a time changed), journal the
+        change and run the write hooks. A new row that would be empty is
+        not created. ValueError (nothing written) if `d` is not ISO. Returns the journal id (0 without a journal), or
+        None if nothing changed.
+        """
+        check_date(d)  # sebelum transaksi: tidak ada yang ditulis
+        eid = self.employee_id
+        # IMMEDIATE: baris lama dibaca dengan write lock, jadi diff, journal
+        # dan UPDATE tidak bisa diselip penulis lain (thread / proses)
+        with self.db.transaction(immediate=True) as conn:
+            old = conn.execute(SELECT_ENTRY, (eid, d)).fetchone()
+
+            if fields is None:
+                if old is None:
+                    return None
+                conn.execute("DELETE FROM entries WHERE employee_id=? AND entry_date=?", (eid, d))
+                new = None
+                before, after = dict(zip(ENTRY_FIELDS, old)), None
+                action = ACTION_DELETE if action == ACTION_EDIT else action
+            elif old is None:
+                new = tuple(fields.get(f, "") for f in ENTRY_FIELDS)
+                if not any(new):
+                    return None
+                conn.execute(UPSERT_ENTRY, (eid, d, *new, *minute_columns(*new[:6])))
+                before, after = None, dict(zip(ENTRY_FIELDS, new))
+                action = ACTION_CREATE if action == ACTION_EDIT else action
+            else:
+                new = tuple(fields.get(f, v) for f, v in zip(ENTRY_FIELDS, old))
+                changed = [i for i, (a, b) in enumerate(zip(old, new)) if a != b]
+                if not changed:
+                    return None
+                cols = [ENTRY_FIELDS[i] for i in changed]
+                values = [new[i] for i in changed]
+                if changed[0] < 6:
+                    # jam berubah → kolom menit turunan ikut ditulis
+                    cols += MINUTE_FIELDS
+                    values += minute_columns(*new[:6])
+                conn.execute(f"""
+                    UPDATE entries SET {", ".join(f"{c}=?" for c in cols)}, updated_at=CURRENT_TIMESTAMP
+                    WHERE employee_id=? AND entry_date=?
+                """, (*values, eid, d))
+                before = {ENTRY_FIELDS[i]: old[i] for i in changed}
+                after = {ENTRY_FIELDS[i]: new[i] for i in changed}
+
+            journal_id = 0
+            if self.journal is not None:
+                journal_id = self.journal.record_in(conn, eid, d, action, before, after, ref)
+            if run_hooks:
+                self._run_write_hooks(conn, [d])
+        self._write_through(d, new)
+        return journal_id
+
+    def save_many(self, items, run_hooks=True):
+        """
+        Upsert [(entry_date, values in ENTRY_FIELDS order)] with one
+        executemany in one transaction. run_hooks=False skips the write
+        hooks (e.g. no sync outbox rows for a history import).
+        Not journaled (bulk import / pull from the sheet).
+        Cached months touched by the batch are invalidated.
+        """
+        items = list(items)
+        if not items:
+            return 0
+        eid = self.employee_id
+        with self.db.transaction(immediate=True) as conn:
+            conn.executemany(UPSERT_ENTRY, [
+                (eid, d, *values, *minute_columns(*values[:6]))
+                for d, values in items
+            ])
+            if run_hooks:
+                self._run_write_hooks(conn, [d for d, _ in items])
+        if self.cache is not None:
+            for ym in {d[:7] for d, _ in items}:
+                self.cache.invalidate((eid, int(ym[:4]), int(ym[5:7])))
+        return len(items)
+
+    def totals(self, start: str, end: str, period="month"):
+        """
+        Work/overtime totals per period with one SUM ... GROUP BY over
+        the (employee_id, entry_date, work_minutes, overtime_minutes) index.
+        period: "month" (YYYY-MM), "quarter" (YYYY-Qn) or "year" (YYYY).
+        Returns [(period_key, days, work_minutes, overtime_minutes)].
+        """
+        key = PERIOD_KEYS[period]
+        conn = self.db.connection()
+        return conn.execute(f"""
+            SELECT {key} AS period, COUNT(*),
+                   IFNULL(SUM(work_minutes), 0), IFNULL(SUM(overtime_minutes), 0)
+            FROM entries
+            WHERE employee_id=? AND entry_date BETWEEN ? AND ?
+            GROUP BY period
+            ORDER BY period
+        """, (self.employee_id, start, end)).fetchall()
+
+    def reasons(self, limit=200):
+        """Distinct past alasan_lembur values, most used first."""
+        conn = self.db.connection()
+        cur = conn.execute("""
+            SELECT alasan_lembur FROM entries
+            WHERE employee_id=? AND alasan_lembur <> ''
+            GROUP BY alasan_lembur
+            ORDER BY COUNT(*) DESC, MAX(entry_date) DESC
+            LIMIT ?
+        """, (self.employee_id, limit))
+        return [r[0] for r in cur]
+
+    def delete(self, d: str, run_hooks=True):
+        """Returns the journal id (0 without a journal), None if there was no entry."""
+        return self._write(d, None, run_hooks=run_hooks)
+
+
+# =============================================================
+# EMPLOYEES
+# =============================================================
+Employee = namedtuple("Employee", "id name spreadsheet")
+
+
+class EmployeeRepository:
+
+    def __init__(self, db):
+        self.db = db
+
+    def list(self):
+        conn = self.db.connection()
+        cur = conn.execute("SELECT id, name, spreadsheet FROM employees ORDER BY name")
+        return [Employee(*r) for r in cur]
+
+    def get(self, employee_id):
+        conn = self.db.connection()
+        row = conn.execute(
+            "SELECT id, name, spreadsheet FROM employees WHERE id=?", (employee_id,)
+        ).fetchone()
+        return Employee(*row) if row else None
+
+    def add(self, name: str, spreadsheet: str):
+        with self.db.transaction() as conn:
+            cur = conn.execute(
+                "INSERT INTO employees (name, spreadsheet) VALUES (?, ?)",
+                (name, spreadsheet)
+            )
+            return Employee(cur.lastrowid, name, spreadsheet)
@@ -0,0 +1,153 @@
+from datetime import date, timedelta
+
+from time_utils import format_duration
+from duration_batch import durations_for_rows
+from instrumentation import metrics
+
+# =============================================================
+# EXCEL EXPORT (STREAMING)
+# =============================================================
+# Workbook write_only: setiap baris langsung di-serialize ke file
+# sementara, jadi memori tetap datar untuk range setahun / lebih.
+# Data dibaca dengan satu query range (EntryRepository.iter_range).
+# openpyxl (±0.5 dtk, ikut menarik numpy) baru di-import saat export.
+
+LAYOUT_DAILY = "daily"      # satu sheet per tanggal (template)
+LAYOUT_SUMMARY = "summary"  # satu sheet, satu baris per tanggal
+
+SUMMARY_HEADER = [
+    "Tanggal", "Jam Mulai 1", "Jam Selesai 1",
+    "Jam Mulai 2", "Jam Selesai 2", "Total Kerja",
+    "Lembur Mulai", "Lembur Selesai", "Total Lembur",
+    "Alasan", "Deskripsi", "Catatan",
+]
+
+
+def iter_days(start: str, end: str):
+    d = date.fromisoformat(start)
+    last = date.fromisoformat(end)
+    while d <= last:
+        yield d.strftime("%Y-%m-%d")
+        d += timedelta(days=1)
+
+
+def iter_range_days(repo, start: str, end: str):
+    """Yield (date_str, row_or_None) for every day, merged with one cursor."""
+    rows = repo.iter_range(start, end)
+    nxt = next(rows, None)
+    for d in iter_days(start, end):
+        row = None
+        while nxt is not None and nxt[0] <= d:
+            if nxt[0] == d:
+                row = nxt[1:]
+            nxt = next(rows, None)
+        yield d, row
+
+
+def with_minutes(pairs, chunk=1000):
+    """
+    (date_str, row) -> (date_str, row, work_minutes, overtime_minutes),
+    computed with the batch calculator one chunk at a time.
+    """
+    buf = []
+
+    def flush():
+        with metrics.timed("export", "hitung durasi"):
+            work, overtime = durations_for_rows([row for _, row in buf])
+        for (d, row), w, o in zip(buf, work, overtime):
+            yield d, row, int(w), int(o)
+
+    for pair in pairs:
+        buf.append(pair)
+        if len(buf) >= chunk:
+            yield from flush()
+            buf = []
+    yield from flush()
+
+
+def day_values(row, work, overtime):
+    if row:
+        jm1,js1,jm2,js2,lm,ls,alasan,desk,note = row
+        tkerja = format_duration(work)
+        tlembur = format_duration(overtime)
+    else:
+        jm1=js1=jm2=js2=lm=ls=alasan=desk=note=""
+        tkerja=""
+        tlembur=""
+    return jm1,js1,jm2,js2,tkerja,lm,ls,tlembur,alasan,desk,note
+
+
+def daily_template(d, row, work, overtime, nama):
+    jm1,js1,jm2,js2,tkerja,lm,ls,tlembur,alasan,desk,note = day_values(row, work, overtime)
+    return [
+        ["Identitas"],
+        ["Nama lengkap", nama],
+        [],
+        ["Tanggal lembur", d],
+        [],
+        ["Waktu Kerja"],
+        ["Jam mulai 1", jm1],
+        ["Jam selesai 1", js1],
+        ["Jam mulai 2", jm2],
+        ["Jam selesai 2", js2],
+        ["Total Waktu Kerja", tkerja],
+        [],
+        ["Tanggal & Waktu Lembur"],
+        ["Jam mulai lembur", lm],
+        ["Jam selesai lembur", ls],
+        ["Jam mulai lembur 2", "-"],
+        ["Jam selesai lembur 2", "-"],
+        ["Total Lembur", tlembur],
+        [],
+        ["Alasan Lembur", alasan],
+        [],
+        ["Deskripsi Pekerjaan", desk],
+        [],
+        ["Catatan Tambahan", note],
+    ]
+
+
+def export_range(path, repo, start: str, end: str, layout=LAYOUT_DAILY, progress=None,
+                 *, nama, cancelled=None):
+    """
+    Stream entries start..end (inclusive, 'YYYY-MM-DD') to an .xlsx file.
+    nama: employee name written in the daily template.
+    progress: optional callable(date_str) called after each day.
+    cancelled: optional threading.Event; when set the file is not written
+    Returns the number of days written (None if cancelled).
+    """
+    with metrics.timed("export", f"{layout} total"):
+        return _export_range(path, repo, start, end, layout, progress, nama, cancelled)
+
+
+def _export_range(path, repo, start, end, layout, progress, nama, cancelled):
+    with metrics.timed("export", "import openpyxl"):
+        from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    count = 0
+
+    if layout == LAYOUT_SUMMARY:
+        ws = wb.create_sheet(f"{start} sd {end}"[:31])
+        ws.append(SUMMARY_HEADER)
+        for d, row, work, overtime in with_minutes(iter_range_days(repo, start, end)):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            ws.append([d, *day_values(row, work, overtime)])
+            count += 1
+            if progress:
+                progress(d)
+    else:
+        for d, row, work, overtime in with_minutes(iter_range_days(repo, start, end)):
+            if cancelled is not None and cancelled.is_set():
+                return None
+            ws = wb.create_sheet(d)
+            for rowdata in daily_template(d, row, work, overtime, nama):
+                ws.append(rowdata)
+            count += 1
+            if progress:
+                progress(d)
+
+    with metrics.timed("export", "save xlsx"):
+        wb.save(path)
+    return count
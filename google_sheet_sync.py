@@ -1,50 +1,242 @@
 import gspread
+from gspread.utils import absolute_range_name
 from oauth2client.service_account import ServiceAccountCredentials
+from rate_limiter import RateLimiter
+from sheet_backend import SheetBackend
+from sheet_layout import (
+    SYNC_DAILY, SYNC_LEDGER_MONTH, LEDGER_HEADER, DAILY_RANGE, daily_rows, parse_daily,
+    ledger_title, ledger_rows, ledger_range, ledger_values, parse_ledger,
+)
 
-class GoogleSheetSync:
-    def __init__(self, creds_path: str, sheet_name: str):
+# client ter-otorisasi per file credentials, dipakai ulang selama
+# proses hidup (token di-refresh otomatis oleh oauth2client)
+_clients = {}
+
+
+def authorize(creds_path: str):
+    if creds_path not in _clients:
         scope = [
             "https://spreadsheets.google.com/feeds",
             "https://www.googleapis.com/auth/drive",
         ]
         creds = ServiceAccountCredentials.from_json_keyfile_name(creds_path, scope)
-        client = gspread.authorize(creds)
-        self.sheet = client.open(sheet_name)
+        _clients[creds_path] = gspread.authorize(creds)
+    return _clients[creds_path]
+
+
+class GoogleSheetSync(SheetBackend):
+    def __init__(self, creds_path: str, sheet_name: str, limiter=None, client=None,
+                 spreadsheet_key=None):
+        """
+        limiter: RateLimiter for every API call (default: Sheets quota)
+        client: pre-authorized gspread client, e.g. a fake for tests;
+                creds_path is ignored when given
+        spreadsheet_key: open by key (no Drive search); falls back to
+                         sheet_name if the key no longer resolves
+        """
+        self.limiter = limiter or RateLimiter.for_sheets()
+
+        if client is None:
+            client = authorize(creds_path)
+
+        self.sheet = None
+        if spreadsheet_key:
+            try:
+                self.sheet = self.limiter.call(client.open_by_key, spreadsheet_key)
+            except (gspread.exceptions.SpreadsheetNotFound, gspread.exceptions.APIError):
+                self.sheet = None
+        if self.sheet is None:
+            self.sheet = self.limiter.call(client.open, sheet_name)
+
+        self._worksheets = None  # title -> Worksheet (None = dibuat via batch)
+        self.worksheet_ids = {}  # title -> sheetId
+
+    @property
+    def key(self):
+        return self.sheet.id
+
+    # =========================================================
+    # WORKSHEET CACHE
+    # =========================================================
+    def worksheet_index(self):
+        """title -> sheetId, fetched once per session."""
+        if self._worksheets is None:
+            self._worksheets = {
+                ws.title: ws for ws in self.limiter.call(self.sheet.worksheets)
+            }
+            self.worksheet_ids = {t: ws.id for t, ws in self._worksheets.items()}
+        return self.worksheet_ids
+
+    def invalidate_worksheets(self):
+        self._worksheets = None
+        self.worksheet_ids = {}
+
+    def _remember(self, title, sheet_id, ws=None):
+        self.worksheet_ids[title] = sheet_id
+        self._worksheets[title] = ws
 
     def ensure_daily_sheet(self, date_str: str):
-        try:
-            ws = self.sheet.worksheet(date_str)
-        except gspread.exceptions.WorksheetNotFound:
-            ws = self.sheet.add_worksheet(title=date_str, rows="200", cols="10")
+        ids = self.worksheet_index()
+        ws = self._worksheets.get(date_str)
+        if ws is not None:
+            return ws
+
+        if date_str in ids:
+            ws = self.limiter.call(self.sheet.get_worksheet_by_id, ids[date_str])
+        else:
+            ws = self.limiter.call(self.sheet.add_worksheet, title=date_str, rows="200", cols="10")
+        self._remember(date_str, ws.id, ws)
         return ws
 
+    def daily_rows(self, date_str: str, data: dict):
+        return daily_rows(date_str, data)
+
     def write_daily_sheet(self, date_str: str, data: dict):
         ws = self.ensure_daily_sheet(date_str)
+        try:
+            self.limiter.call(ws.clear)
+            self.limiter.call(ws.update, "A1", self.daily_rows(date_str, data))
+        except Exception:
+            # worksheet mungkin dihapus dari luar → muat ulang cache
+            self.invalidate_worksheets()
+            raise
+
+    def write_month(self, payloads):
+        """
+        Write many daily sheets with a fixed number of API calls:
+        one batch_update adding every missing worksheet, one batch
+        clear and one values_batch_update. Worksheet metadata comes
+        from the session cache (fetched on first use only).
+        payloads: list of (date_str, data).
+        """
+        payloads = list(payloads)
+        if not payloads:
+            return
+
+        try:
+            self._write_month(payloads)
+        except Exception:
+            self.invalidate_worksheets()
+            raise
+
+    def _write_month(self, payloads):
+        existing = self.worksheet_index()
+        missing = [d for d, _ in payloads if d not in existing]
+        if missing:
+            res = self.limiter.call(self.sheet.batch_update, {
+                "requests": [
+                    {"addSheet": {"properties": {
+                        "title": d,
+                        "gridProperties": {"rowCount": 200, "columnCount": 10},
+                    }}}
+                    for d in missing
+                ]
+            })
+            for reply in res.get("replies", []):
+                props = reply["addSheet"]["properties"]
+                self._remember(props["title"], props["sheetId"])
+
+        self.limiter.call(self.sheet.values_batch_clear, body={
+            "ranges": [absolute_range_name(d) for d, _ in payloads]
+        })
+        self.limiter.call(self.sheet.values_batch_update, {
+            "valueInputOption": "RAW",
+            "data": [
+                {"range": absolute_range_name(d, "A1"), "values": self.daily_rows(d, data)}
+                for d, data in payloads
+            ],
+        })
 
-        rows = [
-            ["Identitas"],
-            ["Nama lengkap", data.get("nama", "Refia Karsista")],
-            [],
-            ["Tanggal lembur", date_str],
-            [],
-            ["Waktu Kerja Work Day"],
-            ["Jam mulai 1", data.get("jam_mulai_1", "")],
-            ["Jam selesai 1", data.get("jam_selesai_1", "")],
-            ["Jam mulai 2", data.get("jam_mulai_2", "")],
-            ["Jam selesai 2", data.get("jam_selesai_2", "")],
-            ["Total Waktu Kerja", data.get("total_kerja", "")],
-            [],
-            ["Tanggal & Waktu Lembur"],
-            ["Jam mulai lembur", data.get("lembur_mulai", "")],
-            ["Jam selesai lembur", data.get("lembur_selesai", "")],
-            ["Total Lembur", data.get("total_lembur", "")],
-            [],
-            ["Alasan Lembur", data.get("alasan_lembur", "")],
-            [],
-            ["Deskripsi Pekerjaan", data.get("deskripsi_lembur", "")],
-            [],
-            ["Catatan Tambahan", data.get("catatan", "")],
+    # =========================================================
+    # LEDGER (SATU BARIS PER TANGGAL)
+    # =========================================================
+    def write_ledger(self, payloads, layout=SYNC_LEDGER_MONTH):
+        """
+        Write each day as one row of its month / year worksheet (see
+        sheet_layout). Existing worksheets: one values_batch_update with
+        a single A:M range per day. Missing worksheets are added (with
+        their header row) by one extra batch_update.
+        payloads: list of (date_str, data).
+        """
+        payloads = list(payloads)
+        if not payloads:
+            return
+
+        try:
+            self._write_ledger(payloads, layout)
+        except Exception:
+            self.invalidate_worksheets()
+            raise
+
+    def _write_ledger(self, payloads, layout):
+        existing = self.worksheet_index()
+        titles = list(dict.fromkeys(ledger_title(d, layout) for d, _ in payloads))
+        missing = [t for t in titles if t not in existing]
+        data = []
+        if missing:
+            res = self.limiter.call(self.sheet.batch_update, {
+                "requests": [
+                    {"addSheet": {"properties": {
+                        "title": t,
+                        "gridProperties": {
+                            "rowCount": ledger_rows(layout),
+                            "columnCount": len(LEDGER_HEADER),
+                            "frozenRowCount": 1,
+                        },
+                    }}}
+                    for t in missing
+                ]
+            })
+            for reply in res.get("replies", []):
+                props = reply["addSheet"]["properties"]
+                self._remember(props["title"], props["sheetId"])
+            data += [
+                {"range": absolute_range_name(t, "A1"), "values": [LEDGER_HEADER]}
+                for t in missing
+            ]
+
+        data += [
+            {
+                "range": absolute_range_name(ledger_title(d, layout), ledger_range(d, layout)),
+                "values": [ledger_values(d, payload)],
+            }
+            for d, payload in payloads
         ]
+        self.limiter.call(self.sheet.values_batch_update, {
+            "valueInputOption": "RAW",
+            "data": data,
+        })
+
+    # =========================================================
+    # BACA (PULL)
+    # =========================================================
+    def read_month(self, dates, layout=SYNC_DAILY):
+        """
+        Read `dates` back with one values_batch_get (daily sheets or
+        ledger rows). Dates without a worksheet come back as None.
+        """
+        dates = list(dates)
+        existing = self.worksheet_index()
+        if layout == SYNC_DAILY:
+            ranges = {d: absolute_range_name(d, DAILY_RANGE) for d in dates if d in existing}
+        else:
+            ranges = {
+                d: absolute_range_name(ledger_title(d, layout), ledger_range(d, layout))
+                for d in dates if ledger_title(d, layout) in existing
+            }
 
-        ws.clear()
-        ws.update("A1", rows)
+        out = dict.fromkeys(dates)
+        if not ranges:
+            return out
+        try:
+            res = self.limiter.call(self.sheet.values_batch_get, list(ranges.values()))
+        except Exception:
+            self.invalidate_worksheets()
+            raise
+        for d, value_range in zip(ranges, res.get("valueRanges", [])):
+            values = value_range.get("values", [])
+            if layout == SYNC_DAILY:
+                out[d] = parse_daily(values)
+            else:
+                out[d] = parse_ledger(values[0]) if values else None
+        return out
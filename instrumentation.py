@@ -0,0 +1,207 @@
+import cProfile
+import io
+import json
+import pstats
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# =============================================================
+# INSTRUMENTATION (HOT PATH)
+# =============================================================
+# Hitungan dan waktu per (kategori, nama): query SQLite, panggilan
+# Sheets API, refresh Treeview, tahap export. Dicatat selalu (biaya
+# ±1 µs per event) supaya keluhan "aplikasi lambat" di lapangan bisa
+# dilihat di jendela diagnostik (Ctrl+Shift+D) atau di-dump ke file.
+#
+# Kategori yang dipakai: "sql", "sheets", "ui", "export", "sync".
+
+RECENT_SIZE = 200       # event lambat terakhir yang disimpan
+SLOW_THRESHOLD = 0.05   # detik
+
+
+class Stat:
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+
+class Metrics:
+
+    def __init__(self):
+        self.enabled = True
+        self.started = time.time()
+        self._stats = {}
+        self._slow = deque(maxlen=RECENT_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, category, name, seconds):
+        if not self.enabled:
+            return
+        key = (category, name)
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = Stat()
+            stat.add(seconds)
+            if seconds >= SLOW_THRESHOLD:
+                self._slow.append((time.time(), category, name, seconds))
+
+    @contextmanager
+    def timed(self, category, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, time.perf_counter() - t0)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+            self.started = time.time()
+
+    def snapshot(self):
+        """[(category, name, count, total_s, avg_s, max_s)] sorted by total time."""
+        with self._lock:
+            rows = [
+                (cat, name, s.count, s.total, s.total / s.count, s.max)
+                for (cat, name), s in self._stats.items()
+            ]
+        rows.sort(key=lambda r: r[3], reverse=True)
+        return rows
+
+    def slow_events(self):
+        with self._lock:
+            return list(self._slow)
+
+    def dump(self, path):
+        data = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "since": datetime.fromtimestamp(self.started).isoformat(timespec="seconds"),
+            "stats": [
+                {"category": c, "name": n, "count": cnt, "total_s": tot, "avg_s": avg, "max_s": mx}
+                for c, n, cnt, tot, avg, mx in self.snapshot()
+            ],
+            "slow": [
+                {"at": datetime.fromtimestamp(at).isoformat(timespec="milliseconds"),
+                 "category": c, "name": n, "seconds": s}
+                for at, c, n, s in self.slow_events()
+            ],
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+metrics = Metrics()
+
+
+def timed(category, name):
+    """Decorator: record every call of the function under (category, name)."""
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.record(category, name, time.perf_counter() - t0)
+        inner.__name__ = fn.__name__
+        inner.__doc__ = fn.__doc__
+        inner.__wrapped__ = fn
+        return inner
+    return wrap
+
+
+# =============================================================
+# SQLITE
+# =============================================================
+_sql_names = {}
+
+
+def sql_name(sql):
+    # teks SQL yang sama selalu objek string yang sama → cache per teks
+    name = _sql_names.get(sql)
+    if name is None:
+        name = " ".join(sql.split())
+        if len(name) > 90:
+            name = name[:87] + "..."
+        if len(_sql_names) < 1000:
+            _sql_names[sql] = name
+    return name
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    sqlite3.connect(factory=...) connection that times execute /
+    executemany. For SELECTs the time covers running the statement
+    up to the first row; rows fetched later are not included.
+    """
+
+    def execute(self, sql, *args):
+        t0 = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            metrics.record("sql", sql_name(sql), time.perf_counter() - t0)
+
+    def executemany(self, sql, *args):
+        t0 = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            metrics.record("sql", sql_name(sql), time.perf_counter() - t0)
+
+    def commit(self):
+        t0 = time.perf_counter()
+        try:
+            return super().commit()
+        finally:
+            metrics.record("sql", "COMMIT", time.perf_counter() - t0)
+
+
+# =============================================================
+# PROFILER (cProfile)
+# =============================================================
+class Profiler:
+    """
+    On/off cProfile capture of the calling thread (the Tk thread in the
+    app). Work done in job / sync threads is not part of the profile.
+    """
+
+    def __init__(self):
+        self.profile = None
+
+    @property
+    def running(self):
+        return self.profile is not None
+
+    def start(self):
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self, path=None, limit=40):
+        """Stop; write the raw .prof to `path` if given. Returns a text summary."""
+        if self.profile is None:
+            return ""
+        self.profile.disable()
+        profile, self.profile = self.profile, None
+        if path:
+            profile.dump_stats(path)
+        out = io.StringIO()
+        pstats.Stats(profile, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
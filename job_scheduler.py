@@ -0,0 +1,157 @@
+import itertools
+import queue
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+# =============================================================
+# JOB SCHEDULER
+# =============================================================
+# Thread pool kecil untuk pekerjaan lama (export, sync, load bulan).
+# Job dijalankan di worker thread; callback on_done / on_error dan
+# update status selalu dipanggil di thread Tk lewat root.after.
+#
+# Job dengan `key` yang sama tidak dijalankan paralel: submit kedua
+# selagi yang pertama masih antre/jalan akan diabaikan.
+
+
+class Job:
+
+    def __init__(self, job_id, key, label, events):
+        self.id = job_id
+        self.key = key
+        self.label = label
+        self.state = "queued"  # queued / running / done / failed
+        self.progress = ""
+        self.cancelled = threading.Event()
+        self._events = events
+
+    def report(self, text):
+        """Thread-safe progress text for the status bar."""
+        self._events.put(("progress", self.id, text))
+
+
+class JobScheduler:
+
+    def __init__(self, root, max_workers=2, on_status=None, poll_ms=100):
+        """
+        root: anything with .after(ms, fn) (the Tk root)
+        on_status: callable(text) for the status bar
+        """
+        self.root = root
+        self.on_status = on_status or (lambda text: None)
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers, thread_name_prefix="job")
+        self.events = queue.Queue()
+        self.jobs = {}     # job_id -> Job (yang belum selesai)
+        self.by_key = {}   # key -> job_id
+        self._ids = itertools.count(1)
+        self._callbacks = {}
+        self._polling = False
+
+    def is_active(self, key):
+        return key in self.by_key
+
+    def submit(self, key, label, fn, *args, on_done=None, on_error=None, **kwargs):
+        """
+        Run fn(job, *args, **kwargs) on the pool; fn may call job.report()
+        and should check job.cancelled. on_done(result) / on_error(exc)
+        run on the Tk thread. Returns the job id, or None if a job with
+        the same key is still active.
+        """
+        if key is not None and key in self.by_key:
+            self.on_status(f"{label}: masih berjalan")
+            return None
+
+        job = Job(next(self._ids), key, label, self.events)
+        self.jobs[job.id] = job
+        if key is not None:
+            self.by_key[key] = job.id
+        self._callbacks[job.id] = (on_done, on_error)
+
+        def run():
+            self.events.put(("running", job.id, None))
+            try:
+                result = fn(job, *args, **kwargs)
+            except Exception as e:
+                traceback.print_exc()
+                self.events.put(("failed", job.id, e))
+            else:
+                self.events.put(("done", job.id, result))
+
+        self.executor.submit(run)
+        self._update_status()
+        self._ensure_polling()
+        return job.id
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job:
+            job.cancelled.set()
+
+    def shutdown(self):
+        """Cancel running jobs; queued jobs are dropped without starting."""
+        for job in self.jobs.values():
+            job.cancelled.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    # =========================================================
+    # MAIN THREAD
+    # =========================================================
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        while True:
+            try:
+                kind, job_id, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+
+            if kind == "running":
+                job.state = "running"
+            elif kind == "progress":
+                job.progress = payload
+            else:
+                job.state = kind
+                self._finish(job, kind, payload)
+
+        self._update_status()
+        if self.jobs:
+            self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
+
+    def _finish(self, job, kind, payload):
+        del self.jobs[job.id]
+        if self.by_key.get(job.key) == job.id:
+            del self.by_key[job.key]
+
+        on_done, on_error = self._callbacks.pop(job.id)
+        try:
+            if kind == "done" and on_done:
+                on_done(payload)
+            elif kind == "failed" and on_error:
+                on_error(payload)
+        except Exception:
+            traceback.print_exc()
+
+    def _update_status(self):
+        if not self.jobs:
+            self.on_status("Ready")
+            return
+        parts = []
+        for job in self.jobs.values():
+            text = f"#{job.id} {job.label}"
+            if job.state == "queued":
+                text += " (antre)"
+            elif job.progress:
+                text += f" {job.progress}"
+            parts.append(text)
+        self.on_status(" | ".join(parts))
@@ -1,113 +1,55 @@
+from time import perf_counter
+_STARTUP_T0 = perf_counter()  # sebelum import lain, untuk startup.log
+
 import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
+from tkinter import ttk, messagebox, filedialog, simpledialog
 import sqlite3
-from datetime import datetime, date, timedelta, time
-import time
-import calendar
-from openpyxl import Workbook
-from google_sheet_sync import GoogleSheetSync
+from datetime import datetime, date
+from entry_repository import month_days, check_date
+from time_utils import format_duration, calc_total_kerja, calc_total_lembur
+from excel_export import LAYOUT_DAILY, LAYOUT_SUMMARY
+from db_connection import default_db_path, app_dir
+from startup_log import StartupLog
+from sync_worker import SyncWorker
+from job_scheduler import JobScheduler
+from range_view import VirtualDayTable
+from autocomplete import Autocomplete, time_index, text_index
+from timesheet_core import TimesheetCore, SHEET_NAME
+from instrumentation import metrics, timed, Profiler
+from sheet_layout import SYNC_DAILY, SYNC_LEDGER_MONTH, SYNC_LEDGER_YEAR
+from sheet_reconcile import CONFLICT
+from change_journal import UndoHistory
 import os
-import sys
-
-DB_PATH = "timesheet.db"
-
-# =============================================================
-# RESOURCE PATH (FOR PYINSTALLER)
-# =============================================================
-def resource_path(relative_path):
-    """
-    Get absolute path to resource, works for dev and for PyInstaller exe
-    """
-    try:
-        base_path = sys._MEIPASS  # PyInstaller temp folder
-    except Exception:
-        base_path = os.path.abspath(".")
-    return os.path.join(base_path, relative_path)
-
-CREDENTIALS_PATH = resource_path("credentials.json")
-
-# =============================================================
-# DATABASE PATCH
-# =============================================================
-def ensure_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS entries (
-            id INTEGER PRIMARY KEY,
-            entry_date TEXT NOT NULL,
-            jam_mulai_1 TEXT,
-            jam_selesai_1 TEXT,
-            jam_mulai_2 TEXT,
-            jam_selesai_2 TEXT,
-            lembur_mulai TEXT,
-            lembur_selesai TEXT,
-            alasan_lembur TEXT,
-            deskripsi_lembur TEXT,
-            note TEXT
-        )
-    """)
-
-    # patch kolom jika belum ada
-    try: cur.execute("ALTER TABLE entries ADD COLUMN alasan_lembur TEXT")
-    except: pass
-    try: cur.execute("ALTER TABLE entries ADD COLUMN deskripsi_lembur TEXT")
-    except: pass
-
-    conn.commit()
-    conn.close()
-
-# =============================================================
-# UTILITAS WAKTU
-# =============================================================
-def to_minutes(t: str):
-    if not t:
-        return 0
-    try:
-        h, m = map(int, t.split(":"))
-        return h * 60 + m
-    except:
-        return 0
-
-
-def format_duration(minutes: int):
-    if minutes <= 0:
-        return "0 menit"
-    h = minutes // 60
-    m = minutes % 60
-    return f"{h} jam {m} menit"
-
-
-def calc_total_kerja(jm1, js1, jm2, js2):
-    total = 0
-
-    a = to_minutes(jm1)
-    b = to_minutes(js1)
-    c = to_minutes(jm2)
-    d = to_minutes(js2)
-
-    if b > a:
-        total += (b - a)
-    if d > c:
-        total += (d - c)
 
-    return format_duration(total)
+DB_PATH = default_db_path()  # absolut; bisa diganti lewat env TIMESHEET_DB
 
+TREE_COLUMNS = (
+    "Tanggal", "Jam Mulai 1", "Jam Selesai 1",
+    "Jam Mulai 2", "Jam Selesai 2", "Total Kerja",
+    "Lembur Mulai", "Lembur Selesai", "Total Lembur",
+    "Alasan", "Deskripsi", "Catatan"
+)
 
-def calc_total_lembur(lm, ls):
-    a = to_minutes(lm)
-    b = to_minutes(ls)
 
-    if a == 0 or b == 0:
-        return "0 menit"
+def tree_values(d, row):
+    if row:
+        jm1,js1,jm2,js2,lm,ls,alasan,desk,note = row
+        tkerja  = calc_total_kerja(jm1,js1,jm2,js2)
+        tlembur = calc_total_lembur(lm,ls)
+    else:
+        jm1=js1=jm2=js2=lm=ls=alasan=desk=note=""
+        tkerja = ""
+        tlembur = ""
 
-    if b < a:
-        b += 24 * 60   # lembur lewat tengah malam
+    return (d,jm1,js1,jm2,js2,tkerja,lm,ls,tlembur,alasan,desk,note)
 
-    dur = b - a
-    return format_duration(dur)
+AUTOSAVE_DELAY_MS = 800  # jeda setelah ketikan terakhir sebelum disimpan
 
+SYNC_LAYOUT_LABELS = {
+    SYNC_DAILY: "Sheet per hari",
+    SYNC_LEDGER_MONTH: "Ledger per bulan",
+    SYNC_LEDGER_YEAR: "Ledger per tahun",
+}
 
 ALASAN_PRESET = [
     "Deadline proyek",
@@ -128,32 +70,82 @@ class TimesheetApp:
         self.root.title("Timesheet App Final Version")
         self.root.geometry("1200x750")
 
-        ensure_db()
-
-        self.gs = None  # Google sheet handler
+        # data / export / sync ada di TimesheetCore (dipakai juga oleh CLI)
+        self.core = TimesheetCore(DB_PATH)
+        self.settings = self.core.settings
+        self.outbox = self.core.outbox
+        self.employees = self.core.employees
+        self.month_cache = self.core.month_cache
+
+        self.sync_worker = None
+        self.employee = self.core.current_employee()
+        self.repo = self.core.repo(self.employee)
+        self.flusher = None
+        self.month_model = None
+        self.tree_rows = {}  # iid -> values yang sedang tampil
+
+        self.load_gen = 0  # load bulan terbaru; hasil load lama dibuang
+        self.range_tables = []  # VirtualDayTable yang sedang terbuka
+        self.profiler = Profiler()
+        self.diag_win = None
+
+        # form → autosave ke (form_repo, form_date) yang sedang dibuka
+        self.form_date = None
+        self.form_repo = None
+        self.form_dirty = False  # ada ketikan yang belum disimpan
+        self.autosave_job = None
+        self.undo_history = UndoHistory()
 
         self.build_ui()
-        self.load_month()
+        self.jobs = JobScheduler(
+            self.root, on_status=lambda text: self.status.config(text=text)
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        # jendela diagnostik sengaja tidak punya tombol
+        self.root.bind("<Control-Shift-D>", lambda e: self.open_diagnostics())
+        self.root.bind("<Control-z>", lambda e: self.undo())
+        self.root.bind("<Control-y>", lambda e: self.redo())
+        self.root.bind("<Control-Shift-Z>", lambda e: self.redo())
 
-    # =========================================================
-    # TIME LIST
-    # =========================================================
-    def make_time_values(self, step=5):
-        vals = []
-        for h in range(24):
-            for m in range(0, 60, step):
-                vals.append(f"{h:02d}:{m:02d}")
-        return vals
+        self.load_month()
+        self.load_reasons()
+        self.start_outbox_flusher()
+
+    def on_close(self):
+        self.autosave()
+        self.profiler.stop()
+        # job yang masih jalan (sync, export) berhenti secepatnya, supaya
+        # proses tidak tetap hidup tanpa jendela
+        self.cancel_sync()
+        self.jobs.shutdown()
+        self.core.stop_sheets()
+        if self.flusher:
+            self.flusher.stop()
+        self.root.destroy()
+
+    def show_job_error(self, e):
+        messagebox.showerror("ERROR", str(e))
 
     # =========================================================
     # AUTOCOMPLETE
     # =========================================================
-    def enable_autocomplete(self, cb, values):
-        def on_key(event):
-            typed = cb.get()
-            matches = [v for v in values if v.startswith(typed)]
-            cb["values"] = matches if matches else values
-        cb.bind("<KeyRelease>", on_key)
+    def enable_autocomplete(self, cb, index):
+        # index dipakai bersama; lookup prefix O(1), values Tk di-debounce
+        return Autocomplete(cb, index)
+
+    def load_reasons(self):
+        # alasan lama dari DB ikut jadi saran (di belakang preset)
+        repo = self.repo
+        self.jobs.submit(
+            ("reasons", repo.employee_id), "Load alasan",
+            lambda job: repo.reasons(),
+            on_done=lambda reasons: self.alasan_ac.set_index(text_index(ALASAN_PRESET + reasons)),
+        )
+
+    def remember_reason(self, alasan):
+        values = self.alasan_ac.index.values
+        if alasan.strip() and alasan not in values:
+            self.alasan_ac.set_index(text_index(values + (alasan,)))
 
     # =========================================================
     # UI
@@ -177,8 +169,29 @@ class TimesheetApp:
         self.year_cb.set(datetime.now().year)
 
         ttk.Button(top, text="Load Bulan", command=self.load_month).grid(row=0, column=4, padx=(10, 0))
-        ttk.Button(top, text="Sync Google Sheet", command=self.sync_current_month).grid(row=0, column=5, padx=10)
-        ttk.Button(top, text="Export Excel", command=self.export_excel).grid(row=0, column=6)
+        self.sync_btn = ttk.Button(top, text="Sync Google Sheet", command=self.sync_current_month)
+        self.sync_btn.grid(row=0, column=5, padx=10)
+        self.cancel_sync_btn = ttk.Button(top, text="Batal Sync", command=self.cancel_sync, state="disabled")
+        self.cancel_sync_btn.grid(row=0, column=6)
+        ttk.Button(top, text="Export Excel", command=self.export_excel).grid(row=0, column=7, padx=(10, 0))
+        ttk.Button(top, text="Laporan", command=self.open_report).grid(row=0, column=8, padx=(10, 0))
+        ttk.Button(top, text="Lihat Range", command=self.open_range_view).grid(row=0, column=9, padx=(10, 0))
+        ttk.Button(top, text="Debug", command=self.open_debug_panel).grid(row=0, column=10, padx=(10, 0))
+
+        ttk.Label(top, text="Karyawan").grid(row=1, column=0, pady=(8, 0))
+        self.employee_cb = ttk.Combobox(top, width=30, state="readonly")
+        self.employee_cb.grid(row=1, column=1, columnspan=3, sticky="w", pady=(8, 0))
+        self.employee_cb.bind("<<ComboboxSelected>>", lambda e: self.on_employee_selected())
+        ttk.Button(top, text="+ Karyawan", command=self.add_employee).grid(row=1, column=4, padx=(10, 0), pady=(8, 0))
+        ttk.Label(top, text="Layout Sheet").grid(row=1, column=5, pady=(8, 0))
+        self.layout_cb = ttk.Combobox(top, values=list(SYNC_LAYOUT_LABELS.values()), width=16, state="readonly")
+        self.layout_cb.grid(row=1, column=6, pady=(8, 0))
+        self.layout_cb.set(SYNC_LAYOUT_LABELS[self.core.sync_layout()])
+        self.layout_cb.bind("<<ComboboxSelected>>", lambda e: self.on_layout_selected())
+        ttk.Button(top, text="Import Data", command=self.import_data).grid(row=1, column=7, padx=(10, 0), pady=(8, 0))
+        ttk.Button(top, text="Sheet Harian", command=self.write_daily_sheet).grid(row=1, column=8, padx=(10, 0), pady=(8, 0))
+        ttk.Button(top, text="Tarik dari Sheet", command=self.pull_current_month).grid(row=1, column=9, padx=(10, 0), pady=(8, 0))
+        self.refresh_employees()
 
         # SPLIT
         main = ttk.Frame(wrapper)
@@ -192,12 +205,14 @@ class TimesheetApp:
         self.date_cb = ttk.Combobox(left, width=15)
         self.date_cb.pack(anchor="w")
         self.date_cb.bind("<<ComboboxSelected>>", lambda e: self.load_entry_for_date())
+        self.date_cb.bind("<Return>", lambda e: self.load_entry_for_date())
+        self.date_cb.bind("<FocusOut>", lambda e: self.on_date_typed())
 
-        times = self.make_time_values()
+        times = time_index()
 
         def add_time(label):
             ttk.Label(left, text=label).pack(anchor="w")
-            cb = ttk.Combobox(left, width=15, values=times)
+            cb = ttk.Combobox(left, width=15)
             cb.pack(anchor="w")
             self.enable_autocomplete(cb, times)
             return cb
@@ -210,8 +225,9 @@ class TimesheetApp:
         self.ls = add_time("Lembur selesai")
 
         ttk.Label(left, text="Alasan lembur").pack(anchor="w")
-        self.alasan = ttk.Combobox(left, values=ALASAN_PRESET, width=30)
+        self.alasan = ttk.Combobox(left, width=30)
         self.alasan.pack(anchor="w")
+        self.alasan_ac = self.enable_autocomplete(self.alasan, text_index(ALASAN_PRESET))
 
         ttk.Label(left, text="Deskripsi lembur").pack(anchor="w")
         self.deskripsi = tk.Text(left, width=30, height=4)
@@ -221,31 +237,83 @@ class TimesheetApp:
         self.note = tk.Text(left, width=30, height=4)
         self.note.pack(anchor="w")
 
+        # AUTOSAVE: setiap perubahan form disimpan AUTOSAVE_DELAY_MS
+        # setelah ketikan terakhir (Autocomplete sudah bind KeyRelease → add)
+        for w in (self.jm1, self.js1, self.jm2, self.js2, self.lm, self.ls, self.alasan):
+            w.bind("<KeyRelease>", self.schedule_autosave, add="+")
+            w.bind("<<ComboboxSelected>>", self.schedule_autosave, add="+")
+        for w in (self.deskripsi, self.note):
+            w.bind("<KeyRelease>", self.schedule_autosave, add="+")
+
         ttk.Button(left, text="Simpan", command=self.save_entry).pack(pady=5)
         ttk.Button(left, text="Hapus", command=self.delete_entry).pack()
+        undo_bar = ttk.Frame(left)
+        undo_bar.pack(pady=5)
+        ttk.Button(undo_bar, text="Undo", command=self.undo).pack(side="left")
+        ttk.Button(undo_bar, text="Redo", command=self.redo).pack(side="left", padx=(5, 0))
 
         # RIGHT PANEL → TREEVIEW
         right = ttk.Frame(main)
         right.pack(side="left", fill="both", expand=True)
 
-        cols = (
-            "Tanggal", "Jam Mulai 1", "Jam Selesai 1",
-            "Jam Mulai 2", "Jam Selesai 2", "Total Kerja",
-            "Lembur Mulai", "Lembur Selesai", "Total Lembur",
-            "Alasan", "Deskripsi", "Catatan"
-        )
-
-        self.tree = ttk.Treeview(right, columns=cols, show="headings")
-        for c in cols:
+        self.tree = ttk.Treeview(right, columns=TREE_COLUMNS, show="headings")
+        for c in TREE_COLUMNS:
             self.tree.heading(c, text=c)
             self.tree.column(c, width=130, anchor="center")
 
+        self.tree.tag_configure("sync_ok", background="#e3f6e3")
+        self.tree.tag_configure("sync_fail", background="#f9dcdc")
+
         self.tree.pack(fill="both", expand=True)
         self.tree.bind("<Double-1>", self.on_tree_double)
 
         self.status = ttk.Label(self.root, text="Ready")
         self.status.pack(fill="x")
 
+    # =========================================================
+    # KARYAWAN
+    # =========================================================
+    def refresh_employees(self):
+        self.employee_list = self.employees.list()
+        self.employee_cb["values"] = [e.name for e in self.employee_list]
+        self.employee_cb.set(self.employee.name)
+
+    def on_employee_selected(self):
+        idx = self.employee_cb.current()
+        if idx >= 0:
+            self.set_employee(self.employee_list[idx])
+
+    def set_employee(self, employee):
+        if employee.id == self.employee.id:
+            return
+        self.employee = employee
+        self.repo = self.core.repo(employee)
+        self.settings.set("current_employee", employee.id)
+        self.tree_rows = {}  # paksa bangun ulang (tag sync milik karyawan lain)
+        self.load_month()
+        self.refresh_range_tables()
+        self.load_entry_for_date()
+        self.load_reasons()
+
+    def add_employee(self):
+        name = simpledialog.askstring("Karyawan baru", "Nama lengkap:", parent=self.root)
+        if not name or not name.strip():
+            return
+        name = name.strip()
+        spreadsheet = simpledialog.askstring(
+            "Karyawan baru", "Nama Google Spreadsheet:",
+            initialvalue=f"{SHEET_NAME} - {name}", parent=self.root
+        )
+        if not spreadsheet:
+            return
+        try:
+            employee = self.employees.add(name, spreadsheet.strip())
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Error", f"Karyawan '{name}' sudah ada")
+            return
+        self.set_employee(employee)
+        self.refresh_employees()
+
     # =========================================================
     # LOAD BULAN
     # =========================================================
@@ -253,11 +321,7 @@ class TimesheetApp:
         month = int(self.month_cb.get())
         year = int(self.year_cb.get())
 
-        _, ndays = calendar.monthrange(year, month)
-        self.days = [
-            date(year, month, i).strftime("%Y-%m-%d")
-            for i in range(1, ndays + 1)
-        ]
+        self.days = month_days(year, month)
 
         self.date_cb["values"] = self.days
         self.populate_tree()
@@ -266,56 +330,76 @@ class TimesheetApp:
     # POPULATE TREEVIEW
     # =========================================================
     def populate_tree(self):
-        for i in self.tree.get_children():
-            self.tree.delete(i)
-
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-
-        for d in self.days:
-            cur.execute("""
-                SELECT jam_mulai_1, jam_selesai_1, jam_mulai_2, jam_selesai_2,
-                       lembur_mulai, lembur_selesai,
-                       alasan_lembur, deskripsi_lembur, note
-                FROM entries WHERE entry_date=?
-            """, (d,))
-            row = cur.fetchone()
-
-            if row:
-                jm1,js1,jm2,js2,lm,ls,alasan,desk,note = row
-                tkerja  = calc_total_kerja(jm1,js1,jm2,js2)
-                tlembur = calc_total_lembur(lm,ls)
-            else:
-                jm1=js1=jm2=js2=lm=ls=alasan=desk=note=""
-                tkerja = ""
-                tlembur = ""
-
-            self.tree.insert(
-                "", "end", iid=d,
-                values=(d,jm1,js1,jm2,js2,tkerja,lm,ls,tlembur,alasan,desk,note)
-            )
+        # bulan di cache → langsung; selain itu query di job scheduler,
+        # update Treeview tetap di thread Tk
+        year, month = int(self.days[0][:4]), int(self.days[0][5:7])
+        repo = self.repo
+        self.load_gen += 1
+        gen = self.load_gen
+        if repo.is_cached(year, month):
+            self.apply_month_model(repo.load_month(year, month), gen)
+            return
+        self.jobs.submit(
+            None, f"Load {year}-{month:02d}",
+            lambda job: repo.load_month(year, month),
+            on_done=lambda model: self.apply_month_model(model, gen),
+            on_error=self.show_job_error,
+        )
+
+    @timed("ui", "month tree refresh")
+    def apply_month_model(self, model, gen):
+        if gen != self.load_gen:
+            return
+        self.month_model = model
 
-        conn.close()
+        rows = {d: tree_values(d, row) for d, row in self.month_model}
+
+        if list(self.tree_rows) != model.days:
+            # bulan berganti → bangun ulang semua baris
+            self.tree.delete(*self.tree.get_children())
+            for d, values in rows.items():
+                self.tree.insert("", "end", iid=d, values=values)
+        else:
+            # bulan sama → update hanya baris yang berubah
+            for d, values in rows.items():
+                if self.tree_rows[d] != values:
+                    self.tree.item(d, values=values)
+
+        self.tree_rows = rows
 
     # =========================================================
     # LOAD ENTRY FORM
     # =========================================================
     def load_entry_for_date(self):
-        d = self.date_cb.get()
+        # edit yang belum tersimpan milik tanggal / karyawan sebelumnya
+        self.autosave(remember=True)
+        d = self.date_cb.get().strip()
         if not d:
             return
+        if not self.valid_date(d):
+            self.date_cb.set(self.form_date or "")  # kembali ke tanggal form
+            return
+        self.form_date = d
+        self.form_repo = self.repo
+        self.fill_form(d)
+
+    def on_date_typed(self):
+        # tanggal diketik tanpa Enter / pilih: form pindah ke tanggal itu
+        # sebelum diedit, supaya autosave tidak menulis ke tanggal lama
+        if self.date_cb.get().strip() != (self.form_date or ""):
+            self.load_entry_for_date()
 
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
+    def valid_date(self, d):
+        # combobox tanggal bisa diketik; repository hanya menerima YYYY-MM-DD
+        try:
+            check_date(d)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return False
+        return True
 
-        cur.execute("""
-            SELECT jam_mulai_1, jam_selesai_1, jam_mulai_2, jam_selesai_2,
-                   lembur_mulai, lembur_selesai,
-                   alasan_lembur, deskripsi_lembur, note
-            FROM entries WHERE entry_date=?
-        """, (d,))
-        row = cur.fetchone()
-        conn.close()
+    def fill_form(self, d):
+        row = self.repo.entry(d)
 
         if row:
             jm1,js1,jm2,js2,lm,ls,alasan,desk,note = row
@@ -336,74 +420,192 @@ class TimesheetApp:
         self.note.delete("1.0","end")
         self.note.insert("1.0", note)
 
+        # isi form = isi DB; set() / insert() tidak memicu KeyRelease
+        self.form_dirty = False
+
     # =========================================================
     # SAVE ENTRY
     # =========================================================
+    def form_values(self):
+        return (
+            self.jm1.get(), self.js1.get(), self.jm2.get(), self.js2.get(),
+            self.lm.get(), self.ls.get(), self.alasan.get(),
+            self.deskripsi.get("1.0","end").strip(),
+            self.note.get("1.0","end").strip(),
+        )
+
+    def schedule_autosave(self, event=None):
+        if self.form_date is None:
+            return
+        self.form_dirty = True
+        if self.autosave_job:
+            self.root.after_cancel(self.autosave_job)
+        self.autosave_job = self.root.after(AUTOSAVE_DELAY_MS, self.autosave)
+
+    def autosave(self, remember=False):
+        """
+        Write pending form edits now (debounce timer, date switch, close).
+        remember: also keep the alasan as a suggestion; only when the form
+        is left or saved explicitly, not for half-typed text.
+        """
+        if self.autosave_job:
+            self.root.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        if self.form_date is None:
+            return
+        if remember:
+            self.remember_reason(self.alasan.get())
+        if not self.form_dirty:
+            return  # form tidak diedit → isinya tidak boleh menimpa DB
+
+        self.form_dirty = False
+        d, repo = self.form_date, self.form_repo
+        journal_id = repo.save(d, self.form_values())  # hanya kolom yang berubah
+        if journal_id is None:
+            return
+        self.undo_history.push(journal_id)
+        self.after_write(repo.employee_id, d)
+        self.status.config(text=f"Tersimpan {d} ({datetime.now():%H:%M:%S})")
+
     def save_entry(self):
-        d = self.date_cb.get()
+        # autosave sudah menyimpan; tombol ini menyimpan sekarang, juga
+        # ke tanggal yang diketik di combobox tanpa dipilih
+        d = self.date_cb.get().strip()
         if not d:
             messagebox.showerror("Error", "Pilih tanggal dulu")
             return
-
-        jm1 = self.jm1.get()
-        js1 = self.js1.get()
-        jm2 = self.jm2.get()
-        js2 = self.js2.get()
-        lm  = self.lm.get()
-        ls  = self.ls.get()
-        alasan = self.alasan.get()
-        desk = self.deskripsi.get("1.0","end").strip()
-        note = self.note.get("1.0","end").strip()
-
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-
-        cur.execute("SELECT id FROM entries WHERE entry_date=?", (d,))
-        exists = cur.fetchone()
-
-        if exists:
-            cur.execute("""
-                UPDATE entries SET
-                jam_mulai_1=?, jam_selesai_1=?, jam_mulai_2=?, jam_selesai_2=?,
-                lembur_mulai=?, lembur_selesai=?, alasan_lembur=?, deskripsi_lembur=?, note=?
-                WHERE entry_date=?
-            """, (jm1,js1,jm2,js2,lm,ls,alasan,desk,note,d))
-        else:
-            cur.execute("""
-                INSERT INTO entries (
-                    entry_date, jam_mulai_1, jam_selesai_1,
-                    jam_mulai_2, jam_selesai_2,
-                    lembur_mulai, lembur_selesai,
-                    alasan_lembur, deskripsi_lembur, note
-                ) VALUES (?,?,?,?,?,?,?,?,?,?)
-            """, (d,jm1,js1,jm2,js2,lm,ls,alasan,desk,note))
-
-        conn.commit()
-        conn.close()
-
-        self.populate_tree()
-        messagebox.showinfo("OK", "Data disimpan.")
+        if not self.valid_date(d):
+            return
+        if d != self.form_date:
+            self.form_date, self.form_repo = d, self.repo
+        self.form_dirty = True
+        self.autosave(remember=True)
+
+    def after_write(self, employee_id, d):
+        # hanya baris tanggal itu yang diperbarui (Treeview + tabel range)
+        if self.flusher:
+            self.flusher.wake()
+        if employee_id != self.employee.id:
+            return
+        row = self.repo.entry(d)
+        if self.tree.exists(d):
+            values = tree_values(d, row)
+            self.tree.item(d, values=values)
+            self.tree_rows[d] = values
+        for table in self.range_tables:
+            table.update_day(d, row)
 
     # =========================================================
     # DELETE ENTRY
     # =========================================================
     def delete_entry(self):
-        d = self.date_cb.get()
-        if not d:
+        self.autosave()
+        d = self.date_cb.get().strip()
+        if not d or not self.valid_date(d):
             return
 
         if not messagebox.askyesno("Hapus?", f"Hapus data {d}?"):
             return
 
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-        cur.execute("DELETE FROM entries WHERE entry_date=?", (d,))
-        conn.commit()
-        conn.close()
-
-        self.populate_tree()
+        journal_id = self.repo.delete(d)
+        if journal_id is not None:
+            self.undo_history.push(journal_id)
+            self.after_write(self.employee.id, d)
+        # isi form lama jangan disimpan lagi saat form dimuat ulang
+        self.form_date = None
+        self.form_dirty = False
         self.load_entry_for_date()
-        messagebox.showinfo("OK", "Entry dihapus.")
+        self.status.config(text=f"Entry {d} dihapus (Ctrl+Z untuk undo)")
+
+    # =========================================================
+    # UNDO / REDO
+    # =========================================================
+    def undo(self):
+        self.autosave()  # edit yang belum tersimpan ikut bisa di-undo
+        journal_id = self.undo_history.pop_undo()
+        if journal_id is None:
+            self.status.config(text="Tidak ada perubahan untuk di-undo")
+            return
+        entry, _ = self.core.undo(journal_id)
+        self.after_undo(entry, "Undo")
+
+    def redo(self):
+        self.autosave()
+        journal_id = self.undo_history.pop_redo()
+        if journal_id is None:
+            self.status.config(text="Tidak ada perubahan untuk di-redo")
+            return
+        entry, _ = self.core.redo(journal_id)
+        self.after_undo(entry, "Redo")
+
+    def after_undo(self, entry, text):
+        d = entry.entry_date
+        self.after_write(entry.employee_id, d)
+        if entry.employee_id == self.employee.id and d == self.form_date:
+            self.fill_form(d)
+        self.status.config(text=f"{text} {d}")
+
+    # =========================================================
+    # RANGE VIEW (MULTI BULAN / TAHUN)
+    # =========================================================
+    def open_range_view(self):
+        win = tk.Toplevel(self.root)
+        win.title("Lihat Range")
+        win.geometry("1200x600")
+
+        bar = ttk.Frame(win, padding=10)
+        bar.pack(fill="x")
+
+        year = int(self.year_cb.get())
+        ttk.Label(bar, text="Dari").pack(side="left")
+        start_e = ttk.Entry(bar, width=12)
+        start_e.insert(0, f"{year:04d}-01-01")
+        start_e.pack(side="left", padx=(5, 10))
+
+        ttk.Label(bar, text="Sampai").pack(side="left")
+        end_e = ttk.Entry(bar, width=12)
+        end_e.insert(0, f"{year:04d}-12-31")
+        end_e.pack(side="left", padx=(5, 10))
+
+        # selalu lewat self.repo → ikut karyawan yang sedang dipilih
+        table = VirtualDayTable(
+            win, TREE_COLUMNS,
+            lambda start, end: self.repo.load_range(start, end),
+            tree_values,
+        )
+        table.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        def show():
+            try:
+                start = date.fromisoformat(start_e.get().strip())
+                end = date.fromisoformat(end_e.get().strip())
+            except ValueError:
+                messagebox.showerror("Error", "Format tanggal: YYYY-MM-DD", parent=win)
+                return
+            if end < start:
+                messagebox.showerror("Error", "Tanggal akhir sebelum tanggal awal", parent=win)
+                return
+            table.set_range(start.isoformat(), end.isoformat())
+
+        def open_day(event):
+            d = table.date_of(table.tree.identify_row(event.y))
+            if d:
+                self.year_cb.set(int(d[:4]))
+                self.month_cb.set(int(d[5:7]))
+                self.load_month()
+                self.date_cb.set(d)
+                self.load_entry_for_date()
+
+        ttk.Button(bar, text="Tampilkan", command=show).pack(side="left")
+        table.tree.bind("<Double-1>", open_day)
+
+        self.range_tables.append(table)
+        win.bind("<Destroy>", lambda e: e.widget is win and self.range_tables.remove(table))
+        show()
+
+    def refresh_range_tables(self):
+        for table in self.range_tables:
+            table.invalidate()
 
     # =========================================================
     # DOUBLE CLICK → LOAD ENTRY
@@ -417,7 +619,62 @@ class TimesheetApp:
     # =========================================================
     # EXPORT EXCEL EXACT TEMPLATE
     # =========================================================
+    def ask_export_options(self):
+        """Small modal dialog: date range + layout. Returns None if cancelled."""
+        month = int(self.month_cb.get())
+        year  = int(self.year_cb.get())
+        days = month_days(year, month)
+
+        dlg = tk.Toplevel(self.root)
+        dlg.title("Export Excel")
+        dlg.transient(self.root)
+        frm = ttk.Frame(dlg, padding=10)
+        frm.pack(fill="both", expand=True)
+
+        ttk.Label(frm, text="Dari (YYYY-MM-DD)").grid(row=0, column=0, sticky="w")
+        start_e = ttk.Entry(frm, width=14)
+        start_e.insert(0, days[0])
+        start_e.grid(row=0, column=1, sticky="w")
+
+        ttk.Label(frm, text="Sampai (YYYY-MM-DD)").grid(row=1, column=0, sticky="w")
+        end_e = ttk.Entry(frm, width=14)
+        end_e.insert(0, days[-1])
+        end_e.grid(row=1, column=1, sticky="w")
+
+        layout = tk.StringVar(value=LAYOUT_DAILY)
+        ttk.Radiobutton(frm, text="Satu sheet per tanggal", variable=layout,
+                        value=LAYOUT_DAILY).grid(row=2, column=0, columnspan=2, sticky="w")
+        ttk.Radiobutton(frm, text="Satu sheet, satu baris per tanggal", variable=layout,
+                        value=LAYOUT_SUMMARY).grid(row=3, column=0, columnspan=2, sticky="w")
+
+        result = {}
+
+        def ok():
+            start, end = start_e.get().strip(), end_e.get().strip()
+            try:
+                if date.fromisoformat(start) > date.fromisoformat(end):
+                    raise ValueError
+            except ValueError:
+                messagebox.showerror("Error", "Range tanggal tidak valid", parent=dlg)
+                return
+            result["opts"] = (start, end, layout.get())
+            dlg.destroy()
+
+        btns = ttk.Frame(frm)
+        btns.grid(row=4, column=0, columnspan=2, pady=(10, 0))
+        ttk.Button(btns, text="Export", command=ok).pack(side="left", padx=5)
+        ttk.Button(btns, text="Batal", command=dlg.destroy).pack(side="left")
+
+        dlg.grab_set()
+        self.root.wait_window(dlg)
+        return result.get("opts")
+
     def export_excel(self):
+        opts = self.ask_export_options()
+        if not opts:
+            return
+        start, end, layout = opts
+
         path = filedialog.asksaveasfilename(
             defaultextension=".xlsx",
             filetypes=[("Excel File",".xlsx")]
@@ -425,154 +682,426 @@ class TimesheetApp:
         if not path:
             return
 
-        wb = Workbook()
-        wb.remove(wb.active)
+        employee = self.employee
+        self.jobs.submit(
+            ("export", path), f"Export {start} s/d {end}",
+            lambda job: self.core.export(
+                employee, path, start, end, layout,
+                progress=job.report, cancelled=job.cancelled,
+            ),
+            on_done=lambda n: messagebox.showinfo("OK", f"Export Excel selesai ({n} hari)."),
+            on_error=self.show_job_error,
+        )
 
-        month = int(self.month_cb.get())
-        year  = int(self.year_cb.get())
-        _, ndays = calendar.monthrange(year, month)
-
-        conn = sqlite3.connect(DB_PATH)
-        cur = conn.cursor()
-
-        for day in range(1, ndays+1):
-            d = date(year, month, day).strftime("%Y-%m-%d")
-
-            cur.execute("""
-                SELECT jam_mulai_1, jam_selesai_1, jam_mulai_2, jam_selesai_2,
-                       lembur_mulai, lembur_selesai,
-                       alasan_lembur, deskripsi_lembur, note
-                FROM entries WHERE entry_date=?
-            """, (d,))
-            row = cur.fetchone()
-
-            if row:
-                jm1,js1,jm2,js2,lm,ls,alasan,desk,note = row
-                tkerja = calc_total_kerja(jm1,js1,jm2,js2)
-                tlembur = calc_total_lembur(lm,ls)
-            else:
-                jm1=js1=jm2=js2=lm=ls=alasan=desk=note=""
-                tkerja=""
-                tlembur=""
-
-            ws = wb.create_sheet(d)
-            template = [
-                ["Identitas"],
-                ["Nama lengkap","Refia Karsista"],
-                [],
-                ["Tanggal lembur", d],
-                [],
-                ["Waktu Kerja"],
-                ["Jam mulai 1", jm1],
-                ["Jam selesai 1", js1],
-                ["Jam mulai 2", jm2],
-                ["Jam selesai 2", js2],
-                ["Total Waktu Kerja", tkerja],
-                [],
-                ["Tanggal & Waktu Lembur"],
-                ["Jam mulai lembur", lm],
-                ["Jam selesai lembur", ls],
-                ["Jam mulai lembur 2", "-"],
-                ["Jam selesai lembur 2", "-"],
-                ["Total Lembur", tlembur],
-                [],
-                ["Alasan Lembur", alasan],
-                [],
-                ["Deskripsi Pekerjaan", desk],
-                [],
-                ["Catatan Tambahan", note],
-            ]
-
-            for rowdata in template:
-                ws.append(rowdata)
-
-        conn.close()
-        wb.save(path)
-        messagebox.showinfo("OK", "Export Excel selesai.")
+    # =========================================================
+    # IMPORT CSV / XLSX
+    # =========================================================
+    def import_data(self):
+        path = filedialog.askopenfilename(
+            filetypes=[("CSV / Excel", "*.csv *.xlsx"), ("CSV", "*.csv"), ("Excel File", "*.xlsx")]
+        )
+        if not path:
+            return
+
+        employee = self.employee
+        if not messagebox.askyesno(
+            "Import", f"Import {os.path.basename(path)} ke data {employee.name}?\n"
+                      "Tanggal yang sudah ada akan ditimpa."
+        ):
+            return
+
+        self.jobs.submit(
+            ("import", path), f"Import {os.path.basename(path)}",
+            lambda job: self.core.import_file(
+                employee, path, cancelled=job.cancelled,
+                progress=lambda n: job.report(f"{n} baris"),
+            ),
+            on_done=self.import_done,
+            on_error=self.show_job_error,
+        )
+
+    def import_done(self, report):
+        self.populate_tree()
+        self.refresh_range_tables()
+        self.load_entry_for_date()
+        self.load_reasons()
+
+        text = report.summary()
+        if report.sample:
+            text += "\n\n" + "\n".join(
+                f"{src} baris {line}: {reason}" for src, line, reason in report.sample[:10]
+            )
+        (messagebox.showwarning if report.rejected else messagebox.showinfo)("Import selesai", text)
+
+    # =========================================================
+    # LAPORAN TOTAL (BULAN / KUARTAL / TAHUN)
+    # =========================================================
+    def open_report(self):
+        win = tk.Toplevel(self.root)
+        win.title("Laporan Total Kerja & Lembur")
+        win.geometry("620x420")
+
+        bar = ttk.Frame(win, padding=10)
+        bar.pack(fill="x")
+
+        year = int(self.year_cb.get())
+        ttk.Label(bar, text="Dari tahun").pack(side="left")
+        from_cb = ttk.Combobox(bar, values=list(range(1970, 2101)), width=7)
+        from_cb.set(year)
+        from_cb.pack(side="left", padx=(5, 10))
+
+        ttk.Label(bar, text="Sampai").pack(side="left")
+        to_cb = ttk.Combobox(bar, values=list(range(1970, 2101)), width=7)
+        to_cb.set(year)
+        to_cb.pack(side="left", padx=(5, 10))
+
+        periods = {"Bulan": "month", "Kuartal": "quarter", "Tahun": "year"}
+        period_cb = ttk.Combobox(bar, values=list(periods), width=10, state="readonly")
+        period_cb.set("Bulan")
+        period_cb.pack(side="left")
+
+        cols = ("Periode", "Hari", "Total Kerja", "Total Lembur")
+        tree = ttk.Treeview(win, columns=cols, show="headings")
+        for c in cols:
+            tree.heading(c, text=c)
+            tree.column(c, width=140, anchor="center")
+        tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        def show(rows):
+            tree.delete(*tree.get_children())
+            for key, days, work, overtime in rows:
+                tree.insert("", "end", values=(
+                    key, days, format_duration(work), format_duration(overtime)
+                ))
+
+        repo = self.repo
+        win.title(f"Laporan Total Kerja & Lembur - {self.employee.name}")
+
+        def refresh():
+            start = f"{int(from_cb.get()):04d}-01-01"
+            end = f"{int(to_cb.get()):04d}-12-31"
+            period = periods[period_cb.get()]
+            self.jobs.submit(
+                ("report", repo.employee_id, start, end, period), f"Laporan {start[:4]}-{end[:4]}",
+                lambda job: repo.totals(start, end, period),
+                on_done=show, on_error=self.show_job_error,
+            )
+
+        ttk.Button(bar, text="Tampilkan", command=refresh).pack(side="left", padx=10)
+        refresh()
+
+    # =========================================================
+    # DEBUG PANEL
+    # =========================================================
+    def open_debug_panel(self):
+        win = tk.Toplevel(self.root)
+        win.title("Debug")
+        win.resizable(False, False)
+
+        frm = ttk.Frame(win, padding=10)
+        frm.pack(fill="both", expand=True)
+
+        ttk.Label(frm, text="Cache bulan", font=("", 10, "bold")).grid(row=0, column=0, columnspan=2, sticky="w")
+        labels = {}
+        for i, (key, text) in enumerate([
+            ("size", "Isi"), ("hits", "Hit"), ("misses", "Miss"), ("hit_rate", "Hit rate"),
+        ], start=1):
+            ttk.Label(frm, text=text).grid(row=i, column=0, sticky="w", padx=(0, 20))
+            labels[key] = ttk.Label(frm, text="")
+            labels[key].grid(row=i, column=1, sticky="w")
+
+        ttk.Label(frm, text="Maks. bulan").grid(row=5, column=0, sticky="w", pady=(10, 0))
+        size_sb = ttk.Spinbox(frm, from_=1, to=240, width=6)
+        size_sb.set(self.month_cache.maxsize)
+        size_sb.grid(row=5, column=1, sticky="w", pady=(10, 0))
+
+        def apply_size():
+            try:
+                size = int(size_sb.get())
+            except ValueError:
+                return
+            self.month_cache.resize(size)
+            self.settings.set("month_cache_size", self.month_cache.maxsize)
+
+        def clear():
+            self.month_cache.clear()
+
+        btns = ttk.Frame(frm)
+        btns.grid(row=6, column=0, columnspan=2, pady=(10, 0), sticky="w")
+        ttk.Button(btns, text="Terapkan", command=apply_size).pack(side="left")
+        ttk.Button(btns, text="Kosongkan cache", command=clear).pack(side="left", padx=(10, 0))
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            st = self.month_cache.stats()
+            labels["size"].config(text=f"{st['size']} / {st['maxsize']}")
+            labels["hits"].config(text=st["hits"])
+            labels["misses"].config(text=st["misses"])
+            labels["hit_rate"].config(text=f"{st['hit_rate']:.0%}")
+            win.after(500, refresh)
+
+        refresh()
+
+    # =========================================================
+    # DIAGNOSTIK (Ctrl+Shift+D)
+    # =========================================================
+    def open_diagnostics(self):
+        if self.diag_win is not None and self.diag_win.winfo_exists():
+            self.diag_win.lift()
+            return
+        win = self.diag_win = tk.Toplevel(self.root)
+        win.title("Diagnostik")
+        win.geometry("820x460")
+
+        frm = ttk.Frame(win, padding=10)
+        frm.pack(fill="both", expand=True)
+
+        since = ttk.Label(frm, text="")
+        since.pack(anchor="w")
+
+        cols = ("kategori", "nama", "jumlah", "total", "rata", "maks")
+        tree = ttk.Treeview(frm, columns=cols, show="headings", height=15)
+        for col, text, width, anchor in [
+            ("kategori", "Kategori", 70, "w"), ("nama", "Nama", 380, "w"),
+            ("jumlah", "Jumlah", 70, "e"), ("total", "Total ms", 90, "e"),
+            ("rata", "Rata ms", 80, "e"), ("maks", "Maks ms", 80, "e"),
+        ]:
+            tree.heading(col, text=text)
+            tree.column(col, width=width, anchor=anchor, stretch=(col == "nama"))
+        scroll = ttk.Scrollbar(frm, orient="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scroll.set)
+
+        btns = ttk.Frame(frm)
+        btns.pack(side="bottom", fill="x", pady=(10, 0))
+        scroll.pack(side="right", fill="y")
+        tree.pack(fill="both", expand=True, pady=(5, 0))
+
+        def dump():
+            path = filedialog.asksaveasfilename(
+                parent=win, defaultextension=".json", initialdir=app_dir(),
+                initialfile=f"diagnostik-{datetime.now():%Y%m%d-%H%M%S}.json",
+                filetypes=[("JSON", "*.json")],
+            )
+            if not path:
+                return
+            try:
+                metrics.dump(path)
+            except OSError as e:
+                messagebox.showerror("ERROR", str(e), parent=win)
+
+        def toggle_profile():
+            if not self.profiler.running:
+                self.profiler.start()
+                profile_btn.config(text="Stop Profil")
+                return
+            path = filedialog.asksaveasfilename(
+                parent=win, defaultextension=".prof", initialdir=app_dir(),
+                initialfile=f"profil-{datetime.now():%Y%m%d-%H%M%S}.prof",
+                filetypes=[("cProfile", "*.prof")],
+            )
+            if not path:
+                return  # batal → profil tetap jalan
+            profile_btn.config(text="Mulai Profil")
+            try:
+                summary = self.profiler.stop(path)
+                with open(os.path.splitext(path)[0] + ".txt", "w", encoding="utf-8") as f:
+                    f.write(summary)
+            except OSError as e:
+                messagebox.showerror("ERROR", str(e), parent=win)
+
+        ttk.Button(btns, text="Reset", command=metrics.reset).pack(side="left")
+        ttk.Button(btns, text="Dump ke File", command=dump).pack(side="left", padx=(10, 0))
+        profile_btn = ttk.Button(
+            btns, text="Stop Profil" if self.profiler.running else "Mulai Profil",
+            command=toggle_profile,
+        )
+        profile_btn.pack(side="left", padx=(10, 0))
+
+        def refresh():
+            if not win.winfo_exists():
+                return
+            since.config(text=f"Sejak {datetime.fromtimestamp(metrics.started):%H:%M:%S}"
+                              f" — {len(metrics.slow_events())} event lambat")
+            rows = metrics.snapshot()
+            tree.delete(*tree.get_children())
+            for cat, name, count, total, avg, mx in rows:
+                tree.insert("", "end", values=(
+                    cat, name, count, f"{total * 1000:.1f}", f"{avg * 1000:.2f}", f"{mx * 1000:.1f}",
+                ))
+            win.after(1000, refresh)
+
+        refresh()
+
+    # =========================================================
+    # AUTO SYNC (OUTBOX)
+    # =========================================================
+    def start_outbox_flusher(self):
+        # tanpa credentials.json auto sync dimatikan, outbox tetap dicatat
+        if not self.core.has_credentials():
+            return
+
+        self.flusher = self.core.outbox_flusher()
+        self.flusher.start()
+        self.root.after(1000, self.poll_outbox)
+
+    def poll_outbox(self):
+        for event in self.flusher.drain():
+            if event[0] == "flushed":
+                self.status.config(text=f"Auto-sync: {len(event[1])} hari terkirim")
+            elif event[0] == "error":
+                self.status.config(
+                    text=f"Auto-sync gagal ({self.outbox.count()} hari menunggu): {event[1]}"
+                )
+        self.root.after(1000, self.poll_outbox)
 
     # =========================================================
     # SYNC GOOGLE SHEET FINAL
     # =========================================================
     def sync_current_month(self):
-        try:
-            self.status.config(text="Syncing Google Sheet...")
-            self.root.update_idletasks()
+        month = int(self.month_cb.get())
+        year  = int(self.year_cb.get())
+        employee = self.employee
+
+        worker = SyncWorker(None)  # client dipilih prepare_sync sesuai layout
+        worker.employee = employee
+        job_id = self.jobs.submit(
+            "sync", f"Sync {employee.name} {month}/{year}",
+            self.run_sync_job, worker, year, month,
+            on_error=self.show_job_error,
+        )
+        if job_id is None:
+            return
 
-            if not self.gs:
-                self.gs = GoogleSheetSync(
-                    resource_path("credentials.json"),
-                    "AI META Timesheet"
-                )
+        self.sync_label = f"{month}/{year}"
+        self.sync_worker = worker
+        self.sync_btn.config(state="disabled")
+        self.cancel_sync_btn.config(state="normal")
+        self.root.after(100, self.poll_sync)
 
-            month = int(self.month_cb.get())
-            year  = int(self.year_cb.get())
-            _, ndays = calendar.monthrange(year, month)
-
-            conn = sqlite3.connect(DB_PATH)
-            cur = conn.cursor()
-
-            for day in range(1, ndays + 1):
-                d = date(year, month, day).strftime("%Y-%m-%d")
-
-                cur.execute("""
-                    SELECT jam_mulai_1, jam_selesai_1,
-                        jam_mulai_2, jam_selesai_2,
-                        lembur_mulai, lembur_selesai,
-                        alasan_lembur, deskripsi_lembur, note
-                    FROM entries
-                    WHERE entry_date=?
-                """, (d,))
-                row = cur.fetchone()
-
-                if row:
-                    jm1, js1, jm2, js2, lm, ls, alasan, desk, note = row
-                    tkerja  = calc_total_kerja(jm1, js1, jm2, js2)
-                    tlembur = calc_total_lembur(lm, ls)
-                else:
-                    jm1 = js1 = jm2 = js2 = lm = ls = alasan = desk = note = ""
-                    tkerja = ""
-                    tlembur = ""
-
-                data = {
-                    "nama": "Refia Karsista",
-                    "jam_mulai_1": jm1,
-                    "jam_selesai_1": js1,
-                    "jam_mulai_2": jm2,
-                    "jam_selesai_2": js2,
-                    "total_kerja": tkerja,
-                    "lembur_mulai": lm,
-                    "lembur_selesai": ls,
-                    "total_lembur": tlembur,
-                    "alasan_lembur": alasan,
-                    "deskripsi_lembur": desk,
-                    "catatan": note,
-                }
-
-                self.status.config(text=f"Sync {d}...")
-                self.root.update_idletasks()
-
-                self.gs.write_daily_sheet(d, data)
-                time.sleep(1)  # to avoid rate limit
-
-            conn.close()
-            messagebox.showinfo(
-                "OK",
-                f"Sync Google Sheet berhasil ({month}/{year})"
-            )
+    def on_layout_selected(self):
+        label = self.layout_cb.get()
+        layout = next(k for k, v in SYNC_LAYOUT_LABELS.items() if v == label)
+        self.core.set_sync_layout(layout)
 
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            messagebox.showerror("ERROR", str(e))
+    def write_daily_sheet(self):
+        # template per hari untuk tanggal terpilih, apa pun layout sync-nya
+        d = self.date_cb.get()
+        if not d:
+            messagebox.showwarning("Peringatan", "Pilih tanggal dulu.")
+            return
+        if not self.core.has_credentials():
+            messagebox.showerror("ERROR", f"credentials tidak ditemukan: {self.core.credentials_path}")
+            return
+        employee = self.employee
+        self.jobs.submit(
+            ("daily_sheet", employee.id, d), f"Sheet harian {d}",
+            lambda job: self.core.write_daily_sheets(employee, [d]),
+            on_done=lambda n: self.status.config(text=f"Sheet {d} ditulis ke {employee.spreadsheet}"),
+            on_error=self.show_job_error,
+        )
 
-        finally:
-            self.status.config(text="Ready")
+    def pull_current_month(self, prefer_sheet=False):
+        if not self.core.has_credentials():
+            messagebox.showerror("ERROR", f"credentials tidak ditemukan: {self.core.credentials_path}")
+            return
+        month = int(self.month_cb.get())
+        year = int(self.year_cb.get())
+        employee = self.employee
+
+        def done(report):
+            if employee.id == self.employee.id:
+                self.populate_tree()
+                self.load_entry_for_date()
+            conflicts = report.dates(CONFLICT)
+            if conflicts and not prefer_sheet:
+                if messagebox.askyesno(
+                    "Konflik",
+                    f"Tarik {month}/{year}:\n{report.summary()}\n\n"
+                    f"Pakai isi sheet untuk {len(conflicts)} hari yang konflik?",
+                ):
+                    self.pull_current_month(prefer_sheet=True)
+                return
+            messagebox.showinfo("Tarik dari Sheet", f"{month}/{year}:\n{report.summary()}")
+
+        self.jobs.submit(
+            "sync", f"Tarik {employee.name} {month}/{year}",
+            lambda job: self.core.pull_month(employee, year, month, prefer_sheet=prefer_sheet),
+            on_done=done, on_error=self.show_job_error,
+        )
+
+    def run_sync_job(self, job, worker, year, month):
+        # worker thread: baca DB, pilih hari yang berubah, lalu kirim.
+        # Event yang sama: "Batal Sync" dan JobScheduler.shutdown sama-sama
+        # menghentikan worker
+        worker.cancelled = job.cancelled
+        self.core.prepare_sync(worker, worker.employee, year, month)
+        worker.report = job.report
+        worker.run()
+
+    def cancel_sync(self):
+        # job "sync" bisa juga "Tarik dari Sheet" (tanpa SyncWorker); worker
+        # sync memakai job.cancelled, jadi cukup batalkan job-nya
+        job_id = self.jobs.by_key.get("sync")
+        if job_id is not None:
+            self.jobs.cancel(job_id)
+            self.cancel_sync_btn.config(state="disabled")
+
+    def poll_sync(self):
+        worker = self.sync_worker
+
+        for event in worker.drain():
+            kind = event[0]
+
+            if kind == "day":
+                _, d, ok, err = event
+                if worker.employee.id == self.employee.id and self.tree.exists(d):
+                    self.tree.item(d, tags=("sync_ok",) if ok else ("sync_fail",))
+
+            elif kind == "error":
+                messagebox.showerror("ERROR", event[1])
+
+            elif kind == "done":
+                _, ok_days, failed_days, cancelled = event
+                self.core.finish_sync(worker.employee, worker, ok_days)
+                msg = f"{len(ok_days)} hari berhasil, {len(failed_days)} gagal"
+                if failed_days:
+                    msg += "\nGagal: " + ", ".join(failed_days)
+                if cancelled:
+                    messagebox.showwarning("Dibatalkan", f"Sync {self.sync_label} dibatalkan.\n{msg}")
+                elif failed_days:
+                    messagebox.showerror("ERROR", f"Sync {self.sync_label} selesai dengan error.\n{msg}")
+                elif not ok_days:
+                    messagebox.showinfo("OK", f"Sync {self.sync_label}: tidak ada perubahan")
+                else:
+                    messagebox.showinfo(
+                        "OK",
+                        f"Sync Google Sheet berhasil ({self.sync_label})"
+                    )
+
+        # semua event worker sudah masuk sebelum job dinyatakan selesai
+        if self.jobs.is_active("sync"):
+            self.root.after(100, self.poll_sync)
+        else:
+            self.sync_btn.config(state="normal")
+            self.cancel_sync_btn.config(state="disabled")
 
 
 # =============================================================
 # RUN PROGRAM
 # =============================================================
 if __name__ == "__main__":
+    startup = StartupLog(_STARTUP_T0)
+    startup.mark("imports")
     root = tk.Tk()
+    startup.mark("tk")
     app = TimesheetApp(root)
+    startup.mark("app")
+
+    def on_first_map(event):
+        if event.widget is root and startup.marks[-1][0] != "shown":
+            startup.mark("shown")
+            startup.write(os.path.join(app_dir(), "startup.log"))
+
+    root.bind("<Map>", on_first_map, add="+")
     root.mainloop()
@@ -1,5 +1,13 @@
 # -*- mode: python ; coding: utf-8 -*-
 
+# Modul berat yang tidak dipakai aplikasi. numpy opsional (duration_batch
+# punya fallback Python murni) tapi ikut ter-bundle lewat openpyxl kalau
+# terpasang di mesin build.
+EXCLUDES = [
+    'numpy', 'pandas', 'PIL', 'matplotlib', 'IPython',
+    'test', 'tkinter.test', 'lib2to3', 'pydoc_data',
+]
+
 
 a = Analysis(
     ['main.py'],
@@ -10,7 +18,7 @@ a = Analysis(
     hookspath=['hooks'],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=EXCLUDES,
     noarchive=False,
     optimize=0,
 )
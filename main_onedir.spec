@@ -0,0 +1,54 @@
+# -*- mode: python ; coding: utf-8 -*-
+
+# Modul berat yang tidak dipakai aplikasi. numpy opsional (duration_batch
+# punya fallback Python murni) tapi ikut ter-bundle lewat openpyxl kalau
+# terpasang di mesin build.
+EXCLUDES = [
+    'numpy', 'pandas', 'PIL', 'matplotlib', 'IPython',
+    'test', 'tkinter.test', 'lib2to3', 'pydoc_data',
+]
+
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[('credentials.json', '.'),],
+    hiddenimports=[],
+    hookspath=['hooks'],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=EXCLUDES,
+    noarchive=False,
+    optimize=0,
+)
+pyz = PYZ(a.pure)
+
+# --onedir: tidak perlu unpack ke _MEIPASS setiap start, jadi
+# window muncul jauh lebih cepat. Hasil: dist/main/main.exe
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='main',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=False,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='main',
+)
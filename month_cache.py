@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+
+# =============================================================
+# MONTH CACHE (LRU)
+# =============================================================
+# MonthModel bulan yang baru dilihat disimpan di memori, key
+# (employee_id, year, month). EntryRepository mengisi cache saat
+# load_month dan meng-update-nya (write-through) setelah save /
+# delete commit, jadi pindah bulan atau double-click baris di bulan
+# yang sama tidak menyentuh SQLite.
+#
+# Model di cache tidak pernah diubah di tempat: write-through
+# membuat MonthModel baru, jadi model yang sedang dibaca thread lain
+# (sync, UI) tetap konsisten.
+
+DEFAULT_MONTH_CACHE_SIZE = 12
+
+
+class MonthCache:
+
+    def __init__(self, maxsize=DEFAULT_MONTH_CACHE_SIZE):
+        self.maxsize = max(1, int(maxsize))
+        self.hits = 0
+        self.misses = 0
+        self._models = OrderedDict()
+        self._versions = {}  # key -> jumlah write; load lama tidak boleh menimpa
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._models)
+
+    def get(self, key):
+        """Cached model or None; counts a hit/miss."""
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                self.misses += 1
+                return None
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+
+    def peek(self, key):
+        """Like get() but without touching counters or LRU order."""
+        with self._lock:
+            return self._models.get(key)
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def put(self, key, model, version=None):
+        """
+        Store a freshly loaded model. version: value of version(key)
+        taken before the query; if a write happened since, the model
+        may be stale and is dropped.
+        """
+        with self._lock:
+            if version is not None and self._versions.get(key, 0) != version:
+                return
+            self._models[key] = model
+            self._models.move_to_end(key)
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+
+    def update(self, key, fn):
+        """Write-through: replace the cached model with fn(model), if cached."""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            model = self._models.get(key)
+            if model is not None:
+                self._models[key] = fn(model)
+
+    def invalidate(self, key):
+        """Drop a month (bulk writes); an in-flight load of it is discarded too."""
+        with self._lock:
+            self._versions[key] = self._versions.get(key, 0) + 1
+            self._models.pop(key, None)
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = max(1, int(maxsize))
+            while len(self._models) > self.maxsize:
+                self._models.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._models),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
@@ -0,0 +1,142 @@
+from collections import OrderedDict
+from datetime import date, timedelta
+from tkinter import ttk
+from instrumentation import timed
+
+# =============================================================
+# VIRTUAL TABLE (RANGE VIEW)
+# =============================================================
+# Treeview dengan jumlah item tetap (= baris yang terlihat). Baris
+# ke-i mewakili tanggal start + offset + i; saat scroll hanya nilai
+# item yang diganti, tidak ada insert/delete. Data diambil per page
+# (range query kecil) dan hanya beberapa page terakhir yang disimpan,
+# jadi memori dan waktu redraw sama untuk 30 atau 3.000 hari.
+
+PAGE_DAYS = 100
+MAX_PAGES = 8
+
+
+class VirtualDayTable(ttk.Frame):
+
+    def __init__(self, master, columns, fetch_range, row_values,
+                 visible=25, page_days=PAGE_DAYS, max_pages=MAX_PAGES, **kw):
+        """
+        fetch_range: callable(start, end) -> {date_str: row} (one range query)
+        row_values: callable(date_str, row_or_None) -> tuple for the columns
+        visible: number of rows materialized in the Treeview
+        """
+        super().__init__(master, **kw)
+        self.fetch_range = fetch_range
+        self.row_values = row_values
+        self.visible = visible
+        self.page_days = page_days
+        self.max_pages = max_pages
+
+        self.start = None
+        self.total = 0
+        self.offset = 0
+        self.pages = OrderedDict()  # page index -> {date_str: row}
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=visible)
+        for c in columns:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=110, anchor="center")
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self.on_scroll)
+
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="right", fill="y")
+
+        self.items = [self.tree.insert("", "end", values=()) for _ in range(visible)]
+
+        for seq, step in (("<Button-4>", -3), ("<Button-5>", 3)):
+            self.tree.bind(seq, lambda e, s=step: self.scroll_to(self.offset + s) or "break")
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Prior>", lambda e: self.scroll_to(self.offset - self.visible) or "break")
+        self.tree.bind("<Next>", lambda e: self.scroll_to(self.offset + self.visible) or "break")
+
+    # =========================================================
+    # DATA
+    # =========================================================
+    def set_range(self, start: str, end: str):
+        self.start = date.fromisoformat(start)
+        self.total = max(0, (date.fromisoformat(end) - self.start).days + 1)
+        self.offset = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop fetched pages (after a save/delete) and redraw."""
+        self.pages.clear()
+        self.redraw()
+
+    def update_day(self, d, row):
+        """One day changed: patch its fetched page and its visible row only."""
+        if self.start is None:
+            return
+        i = (date.fromisoformat(d) - self.start).days
+        if not 0 <= i < self.total:
+            return
+        rows = self.pages.get(i // self.page_days)
+        if rows is not None:
+            if row is None:
+                rows.pop(d, None)
+            else:
+                rows[d] = row
+        if self.offset <= i < self.offset + self.visible:
+            self.tree.item(self.items[i - self.offset], values=self.row_values(d, row))
+
+    def day(self, index):
+        return (self.start + timedelta(days=index)).strftime("%Y-%m-%d")
+
+    def page(self, index):
+        rows = self.pages.get(index)
+        if rows is None:
+            first = index * self.page_days
+            last = min(self.total, first + self.page_days) - 1
+            rows = self.pages[index] = self.fetch_range(self.day(first), self.day(last))
+            while len(self.pages) > self.max_pages:
+                self.pages.popitem(last=False)
+        else:
+            self.pages.move_to_end(index)
+        return rows
+
+    def date_of(self, item):
+        """Date shown by a Treeview item, or None for an empty slot."""
+        if item not in self.items:
+            return None
+        i = self.offset + self.items.index(item)
+        return self.day(i) if self.start is not None and i < self.total else None
+
+    # =========================================================
+    # SCROLL
+    # =========================================================
+    def on_scroll(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(int(float(args[1]) * self.total))
+        elif args[0] == "scroll":
+            n = int(args[1])
+            self.scroll_to(self.offset + (n * self.visible if args[2] == "pages" else n))
+
+    def on_wheel(self, event):
+        self.scroll_to(self.offset - (3 if event.delta > 0 else -3))
+        return "break"
+
+    def scroll_to(self, offset):
+        offset = max(0, min(offset, self.total - self.visible))
+        if offset != self.offset:
+            self.offset = offset
+            self.redraw()
+
+    @timed("ui", "range view redraw")
+    def redraw(self):
+        for n, item in enumerate(self.items):
+            i = self.offset + n
+            if self.start is None or i >= self.total:
+                self.tree.item(item, values=())
+                continue
+            d = self.day(i)
+            self.tree.item(item, values=self.row_values(d, self.page(i // self.page_days).get(d)))
+
+        if self.total:
+            self.scroll.set(self.offset / self.total, min(1.0, (self.offset + self.visible) / self.total))
+        else:
+            self.scroll.set(0.0, 1.0)
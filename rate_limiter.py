@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+
+from instrumentation import metrics
+
+# =============================================================
+# RATE LIMITER (TOKEN BUCKET + EXPONENTIAL BACKOFF)
+# =============================================================
+# Kuota Google Sheets API: 60 request / menit / user (service
+# account = 1 user) dan 300 / menit / project. Bucket diisi
+# 1 token per detik; setiap 429 menurunkan rate (adaptive), setiap
+# sukses menaikkannya pelan-pelan kembali ke maksimum.
+
+SHEETS_REQUESTS_PER_MINUTE = 60
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def error_status(exc):
+    response = getattr(exc, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_retryable(exc):
+    # requests.ConnectionError / Timeout adalah turunan OSError
+    return error_status(exc) in RETRYABLE_STATUS or isinstance(exc, OSError)
+
+
+class TokenBucket:
+
+    def __init__(self, rate, capacity, min_rate=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        rate: tokens per second at full speed
+        capacity: maximum burst size
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate or rate / 16
+        self.capacity = capacity
+        self.tokens = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, n=1):
+        while True:
+            with self.lock:
+                self._refill()
+                # toleransi pembulatan float setelah sleep(wait)
+                if self.tokens >= n - 1e-9:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            self.sleep(wait)
+
+    def throttle(self):
+        """Quota hit: halve the rate and drop any saved-up burst."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def recover(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+
+
+class Backoff:
+
+    def __init__(self, base=1.0, factor=2.0, maximum=64.0, retries=5, rng=random.random):
+        self.base = base
+        self.factor = factor
+        self.maximum = maximum
+        self.retries = retries
+        self.rng = rng
+
+    def delays(self):
+        # "full jitter": acak 0..min(maximum, base * factor^n)
+        for n in range(self.retries):
+            yield self.rng() * min(self.maximum, self.base * self.factor ** n)
+
+
+class RateLimiter:
+
+    def __init__(self, bucket, backoff, sleep=None):
+        """sleep: callable(seconds) for the backoff (default: wait, cut short by stop())"""
+        self.bucket = bucket
+        self.backoff = backoff
+        self.stopped = threading.Event()
+        self.sleep = sleep or self.stopped.wait
+        self.calls = 0
+        self.retries = 0
+
+    def stop(self):
+        """App closing: a failed call is raised right away instead of retried."""
+        self.stopped.set()
+
+    @classmethod
+    def for_sheets(cls, per_minute=SHEETS_REQUESTS_PER_MINUTE, burst=5):
+        return cls(TokenBucket(per_minute / 60.0, burst), Backoff())
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Run fn once a token is available. 429/5xx and network errors are
+        retried with jittered exponential backoff; anything else, or the
+        last failure, is raised to the caller.
+        """
+        delays = self.backoff.delays()
+        name = getattr(fn, "__name__", "call")
+        while True:
+            t0 = time.perf_counter()
+            self.bucket.acquire()
+            t1 = time.perf_counter()
+            metrics.record("sheets", "(tunggu kuota)", t1 - t0)
+            self.calls += 1
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                metrics.record("sheets", name + " (gagal)", time.perf_counter() - t1)
+                delay = next(delays, None)
+                if delay is None or not is_retryable(e) or self.stopped.is_set():
+                    raise
+                if error_status(e) == 429:
+                    self.bucket.throttle()
+                self.retries += 1
+                self.sleep(delay)
+            else:
+                metrics.record("sheets", name, time.perf_counter() - t1)
+                self.bucket.recover()
+                return result
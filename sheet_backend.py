@@ -0,0 +1,117 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+from sheet_layout import (
+    SYNC_DAILY, LEDGER_HEADER, daily_rows, parse_daily,
+    ledger_title, ledger_row, ledger_values, parse_ledger,
+)
+
+# =============================================================
+# SYNC BACKEND
+# =============================================================
+# Target sync = objek dengan interface SheetBackend. GoogleSheetSync
+# untuk spreadsheet sungguhan; LocalSheetSync menyimpan "spreadsheet"
+# sebagai file JSON (atau hanya di memori) dengan layout sel yang sama,
+# untuk test, benchmark dan kerja offline (TIMESHEET_SHEETS_DIR /
+# --sheets-dir). Modul ini tidak meng-import gspread.
+
+
+class SheetBackend(ABC):
+    """
+    Interface of a sync target.
+    payloads: [(date_str, data)] as built by timesheet_core.sync_payload.
+    """
+
+    @property
+    @abstractmethod
+    def key(self):
+        """Identity of the spreadsheet (part of the sync_state key)."""
+
+    @abstractmethod
+    def write_month(self, payloads):
+        """One daily template worksheet per date."""
+
+    @abstractmethod
+    def write_ledger(self, payloads, layout):
+        """One row per date in the month / year worksheet (sheet_layout)."""
+
+    @abstractmethod
+    def read_month(self, dates, layout=SYNC_DAILY):
+        """
+        Read `dates` back in one request. Returns {date_str: data or None};
+        None = no worksheet / empty row.
+        """
+
+
+class LocalSheetSync(SheetBackend):
+
+    def __init__(self, path, sheet_name):
+        """
+        path: JSON file holding the worksheets (created on first write);
+              None = keep everything in memory
+        """
+        self.path = path
+        self.sheet_name = sheet_name
+        self.calls = 0  # jumlah "API call", sama seperti RateLimiter.calls
+        self._lock = threading.Lock()
+        self.worksheets = {}  # title -> [[cell, ...], ...]
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.worksheets = json.load(f)["worksheets"]
+
+    @property
+    def key(self):
+        return f"local:{self.path or self.sheet_name}"
+
+    def _save(self):
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"name": self.sheet_name, "worksheets": self.worksheets}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def _put_row(self, title, row, values):
+        rows = self.worksheets[title]
+        while len(rows) < row:
+            rows.append([])
+        rows[row - 1] = list(values)
+
+    def write_month(self, payloads):
+        payloads = list(payloads)
+        if not payloads:
+            return
+        with self._lock:
+            self.calls += 1
+            for d, data in payloads:
+                self.worksheets[d] = daily_rows(d, data)
+            self._save()
+
+    def write_ledger(self, payloads, layout):
+        payloads = list(payloads)
+        if not payloads:
+            return
+        with self._lock:
+            self.calls += 1
+            for d, data in payloads:
+                title = ledger_title(d, layout)
+                if title not in self.worksheets:
+                    self.worksheets[title] = [list(LEDGER_HEADER)]
+                self._put_row(title, ledger_row(d, layout), ledger_values(d, data))
+            self._save()
+
+    def read_month(self, dates, layout=SYNC_DAILY):
+        out = {}
+        with self._lock:
+            self.calls += 1
+            for d in dates:
+                if layout == SYNC_DAILY:
+                    rows = self.worksheets.get(d)
+                    out[d] = parse_daily(rows) if rows else None
+                else:
+                    rows = self.worksheets.get(ledger_title(d, layout), [])
+                    row = ledger_row(d, layout)
+                    out[d] = parse_ledger(rows[row - 1]) if row <= len(rows) else None
+        return out
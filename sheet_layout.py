@@ -0,0 +1,148 @@
+from datetime import date
+
+# =============================================================
+# LAYOUT GOOGLE SHEET
+# =============================================================
+# daily        : satu worksheet 200x10 per tanggal (template lama)
+# ledger_month : satu worksheet per bulan ("2024-05"), satu baris per tanggal
+# ledger_year  : satu worksheet per tahun ("2024"), satu baris per tanggal
+#
+# Baris ledger dihitung dari tanggal (baris 1 = header, tanggal ke-n
+# dalam periode = baris n + 1), jadi index tanggal -> baris stabil,
+# tidak perlu dibaca dari sheet, dan update satu hari = satu range
+# A{n}:M{n}. Modul ini tidak meng-import gspread.
+
+SYNC_DAILY = "daily"
+SYNC_LEDGER_MONTH = "ledger_month"
+SYNC_LEDGER_YEAR = "ledger_year"
+SYNC_LAYOUTS = (SYNC_DAILY, SYNC_LEDGER_MONTH, SYNC_LEDGER_YEAR)
+
+LEDGER_HEADER = [
+    "Tanggal", "Nama", "Jam Mulai 1", "Jam Selesai 1",
+    "Jam Mulai 2", "Jam Selesai 2", "Total Kerja",
+    "Lembur Mulai", "Lembur Selesai", "Total Lembur",
+    "Alasan", "Deskripsi", "Catatan",
+]
+LEDGER_LAST_COLUMN = chr(ord("A") + len(LEDGER_HEADER) - 1)
+LEDGER_PAYLOAD_KEYS = [
+    "nama", "jam_mulai_1", "jam_selesai_1", "jam_mulai_2", "jam_selesai_2",
+    "total_kerja", "lembur_mulai", "lembur_selesai", "total_lembur",
+    "alasan_lembur", "deskripsi_lembur", "catatan",
+]
+
+
+def state_key(spreadsheet, layout):
+    """sync_state key: each layout keeps its own 'already pushed' hashes."""
+    return spreadsheet if layout == SYNC_DAILY else f"{spreadsheet}#{layout}"
+
+
+def ledger_title(date_str, layout):
+    return date_str[:7] if layout == SYNC_LEDGER_MONTH else date_str[:4]
+
+
+def ledger_row(date_str, layout):
+    d = date.fromisoformat(date_str)
+    if layout == SYNC_LEDGER_MONTH:
+        return d.day + 1
+    return d.timetuple().tm_yday + 1
+
+
+def ledger_rows(layout):
+    """Row count of a new ledger worksheet (header + longest period)."""
+    return (31 if layout == SYNC_LEDGER_MONTH else 366) + 1
+
+
+def ledger_range(date_str, layout):
+    row = ledger_row(date_str, layout)
+    return f"A{row}:{LEDGER_LAST_COLUMN}{row}"
+
+
+def cell_text(v):
+    """Cell as read back -> stripped text; an empty (None) cell is ""."""
+    return "" if v is None else str(v).strip()
+
+
+def ledger_values(date_str, data):
+    return [date_str] + [data.get(key, "") for key in LEDGER_PAYLOAD_KEYS]
+
+
+def parse_ledger(values):
+    """One ledger row as read back -> payload dict, or None if it is empty."""
+    values = list(values[1:len(LEDGER_HEADER)])
+    values += [""] * (len(LEDGER_PAYLOAD_KEYS) - len(values))
+    data = {key: cell_text(v) for key, v in zip(LEDGER_PAYLOAD_KEYS, values)}
+    return data if any(data[k] for k in LEDGER_PAYLOAD_KEYS[1:]) else None
+
+
+# =============================================================
+# TEMPLATE PER HARI
+# =============================================================
+DAILY_LABELS = {
+    "Nama lengkap": "nama",
+    "Jam mulai 1": "jam_mulai_1",
+    "Jam selesai 1": "jam_selesai_1",
+    "Jam mulai 2": "jam_mulai_2",
+    "Jam selesai 2": "jam_selesai_2",
+    "Total Waktu Kerja": "total_kerja",
+    "Jam mulai lembur": "lembur_mulai",
+    "Jam selesai lembur": "lembur_selesai",
+    "Total Lembur": "total_lembur",
+    "Alasan Lembur": "alasan_lembur",
+    "Deskripsi Pekerjaan": "deskripsi_lembur",
+    "Catatan Tambahan": "catatan",
+}
+DAILY_RANGE = "A1:B22"  # seluruh template
+
+
+def daily_rows(date_str, data):
+    return [
+        ["Identitas"],
+        ["Nama lengkap", data["nama"]],
+        [],
+        ["Tanggal lembur", date_str],
+        [],
+        ["Waktu Kerja Work Day"],
+        ["Jam mulai 1", data.get("jam_mulai_1", "")],
+        ["Jam selesai 1", data.get("jam_selesai_1", "")],
+        ["Jam mulai 2", data.get("jam_mulai_2", "")],
+        ["Jam selesai 2", data.get("jam_selesai_2", "")],
+        ["Total Waktu Kerja", data.get("total_kerja", "")],
+        [],
+        ["Tanggal & Waktu Lembur"],
+        ["Jam mulai lembur", data.get("lembur_mulai", "")],
+        ["Jam selesai lembur", data.get("lembur_selesai", "")],
+        ["Total Lembur", data.get("total_lembur", "")],
+        [],
+        ["Alasan Lembur", data.get("alasan_lembur", "")],
+        [],
+        ["Deskripsi Pekerjaan", data.get("deskripsi_lembur", "")],
+        [],
+        ["Catatan Tambahan", data.get("catatan", "")],
+    ]
+
+
+def parse_daily(values):
+    """
+    A daily template sheet as read back -> payload dict, or None if it
+    holds no entry. Rows are matched by label, so moved rows still parse.
+    """
+    data = dict.fromkeys(LEDGER_PAYLOAD_KEYS, "")
+    for row in values:
+        key = DAILY_LABELS.get(cell_text(row[0])) if row else None
+        if key and len(row) > 1:
+            data[key] = cell_text(row[1])
+    return data if any(data[k] for k in LEDGER_PAYLOAD_KEYS[1:]) else None
+
+
+class LedgerWriter:
+    """
+    Gives a GoogleSheetSync the write_month(payloads) interface used by
+    SyncWorker / OutboxFlusher, writing ledger rows instead of daily sheets.
+    """
+
+    def __init__(self, gs, layout):
+        self.gs = gs
+        self.layout = layout
+
+    def write_month(self, payloads):
+        self.gs.write_ledger(payloads, self.layout)
@@ -0,0 +1,120 @@
+from entry_repository import ENTRY_FIELDS
+from bulk_import import clean_time
+from sync_state import payload_hash
+from sheet_layout import LEDGER_PAYLOAD_KEYS, cell_text
+
+# =============================================================
+# PULL / REKONSILIASI
+# =============================================================
+# Isi sheet satu bulan (dibaca sekali) dibandingkan dengan SQLite
+# lewat hash payload, memakai hash terakhir yang di-push (sync_state)
+# sebagai titik acuan:
+#
+#   sheet == lokal               -> IN_SYNC
+#   sheet == acuan, lokal beda   -> LOCAL_NEWER  (akan dikirim sync biasa)
+#   lokal == acuan, sheet beda   -> SHEET_NEWER  (diedit di sheet → ditarik)
+#   keduanya beda dari acuan     -> CONFLICT     (dilaporkan)
+#   isi sheet tidak valid        -> INVALID
+#
+# Sheet yang kosong / hilang tidak pernah menghapus data lokal kecuali
+# konflik diselesaikan dengan "pakai sheet".
+#
+# Total kerja / lembur di sheet diabaikan; payload dibangun ulang dari
+# jam-jamnya, jadi edit jam di sheet tetap terdeteksi dengan benar.
+
+IN_SYNC = "in_sync"
+LOCAL_NEWER = "local_newer"
+SHEET_NEWER = "sheet_newer"
+CONFLICT = "conflict"
+INVALID = "invalid"
+
+# payload key -> kolom entries (tanpa nama & total turunan)
+PAYLOAD_FIELDS = [k for k in LEDGER_PAYLOAD_KEYS if k not in ("nama", "total_kerja", "total_lembur")]
+FIELD_OF_KEY = dict(zip(PAYLOAD_FIELDS, ENTRY_FIELDS))
+
+
+class ReconcileReport:
+
+    def __init__(self):
+        self.days = {}      # date_str -> status
+        self.local = {}     # date_str -> row in ENTRY_FIELDS order / None
+        self.sheet = {}     # date_str -> row / None (sudah divalidasi)
+        self.hashes = {}    # date_str -> hash payload versi sheet
+        self.errors = {}    # date_str -> pesan (INVALID)
+        self.applied = []   # tanggal yang diambil dari sheet
+
+    def dates(self, status):
+        return [d for d, s in self.days.items() if s == status]
+
+    def summary(self):
+        counts = {s: len(self.dates(s)) for s in (IN_SYNC, SHEET_NEWER, LOCAL_NEWER, CONFLICT, INVALID)}
+        text = (
+            f"{counts[IN_SYNC]} sama, {counts[SHEET_NEWER]} berubah di sheet, "
+            f"{counts[LOCAL_NEWER]} berubah lokal, {counts[CONFLICT]} konflik, "
+            f"{counts[INVALID]} tidak valid; {len(self.applied)} hari diambil dari sheet"
+        )
+        for d in self.dates(CONFLICT):
+            text += f"\nKonflik {d}: lokal {describe(self.local[d])} / sheet {describe(self.sheet[d])}"
+        for d, msg in self.errors.items():
+            text += f"\nTidak valid {d}: {msg}"
+        return text
+
+
+def describe(row):
+    if not row:
+        return "(kosong)"
+    return " ".join(v for v in row[:6] if v) or "(tanpa jam)"
+
+
+def sheet_row(data):
+    """Payload read from the sheet -> row in ENTRY_FIELDS order (or None); ValueError on bad times."""
+    if data is None:
+        return None
+    values = [clean_time(FIELD_OF_KEY[k], data.get(k, "")) for k in PAYLOAD_FIELDS[:6]]
+    values += [cell_text(data.get(k)) for k in PAYLOAD_FIELDS[6:]]
+    return tuple(values)
+
+
+def reconcile(local, remote, pushed, make_payload):
+    """
+    local: {date_str: row or None} from SQLite
+    remote: {date_str: payload or None} from SheetBackend.read_month
+    pushed: {date_str: hash} from sync_state
+    make_payload: callable row -> payload dict (sync_payload with the name)
+    Returns a ReconcileReport (nothing is written).
+    """
+    report = ReconcileReport()
+    for d, data in remote.items():
+        lrow = local.get(d)
+        try:
+            rrow = sheet_row(data)
+        except ValueError as e:
+            report.days[d] = INVALID
+            report.errors[d] = str(e)
+            continue
+        if lrow is None and rrow is None and d not in pushed:
+            continue
+
+        lh = payload_hash(make_payload(lrow))
+        rh = payload_hash(make_payload(rrow))
+        base = pushed.get(d)
+        if lh == rh:
+            status = IN_SYNC
+        elif base is None:
+            # belum pernah di-push: yang kosong kalah
+            status = SHEET_NEWER if lrow is None else LOCAL_NEWER if rrow is None else CONFLICT
+        elif base == rh:
+            status = LOCAL_NEWER
+        elif base == lh:
+            status = SHEET_NEWER
+        else:
+            status = CONFLICT
+        if status == SHEET_NEWER and rrow is None and lrow is not None:
+            # sheet / baris dikosongkan: jangan hapus data lokal diam-diam
+            status = CONFLICT
+
+        report.days[d] = status
+        report.local[d] = lrow
+        report.sheet[d] = rrow
+        report.hashes[d] = rh
+    return report
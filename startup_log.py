@@ -0,0 +1,40 @@
+import os
+import time
+from datetime import datetime
+
+# =============================================================
+# STARTUP TIMING LOG
+# =============================================================
+# Mencatat berapa lama tiap tahap start-up (import, Tk, aplikasi,
+# window tampil) dan menambahkan satu baris ke startup.log di
+# folder aplikasi. File dipangkas ke MAX_LINES baris terakhir.
+
+MAX_LINES = 200
+
+
+class StartupLog:
+
+    def __init__(self, t0=None):
+        """t0: time.perf_counter() taken as early as possible in the process"""
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, time.perf_counter() - self.t0))
+
+    def line(self):
+        parts = " ".join(f"{name}={t:.3f}s" for name, t in self.marks)
+        return f"{datetime.now():%Y-%m-%d %H:%M:%S} {parts}"
+
+    def write(self, path):
+        """Append this run; never raises (read-only folder, etc.)."""
+        try:
+            lines = []
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    lines = f.read().splitlines()[-(MAX_LINES - 1):]
+            lines.append(self.line())
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError:
+            pass
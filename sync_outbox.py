@@ -0,0 +1,195 @@
+import threading
+import traceback
+import queue
+
+from sync_state import payload_hash
+
+# =============================================================
+# SYNC OUTBOX
+# =============================================================
+# Setiap save/delete menulis satu baris outbox di transaksi yang
+# sama (EntryRepository write hook), jadi tidak ada perubahan yang
+# hilang walau aplikasi ditutup / offline. OutboxFlusher mengirim
+# isi outbox ke Google Sheet di background.
+#
+# Satu tanggal = satu baris (coalesced); payload dibangun ulang dari
+# data terbaru saat flush. Baris hanya dihapus kalau seq-nya masih
+# sama dengan yang dikirim, jadi edit selama flush tetap dikirim
+# di putaran berikutnya.
+
+
+class SyncOutbox:
+
+    def __init__(self, db):
+        self.db = db
+
+    def enqueue_in(self, conn, employee_id, dates):
+        conn.executemany("""
+            INSERT INTO sync_outbox (employee_id, entry_date, seq, queued_at)
+            VALUES (?, ?, (SELECT IFNULL(MAX(seq), 0) + 1 FROM sync_outbox), CURRENT_TIMESTAMP)
+            ON CONFLICT(employee_id, entry_date) DO UPDATE SET
+            seq=excluded.seq,
+            queued_at=excluded.queued_at,
+            attempts=0,
+            last_error=NULL
+        """, [(employee_id, d) for d in dates])
+
+    def enqueue(self, employee_id, dates):
+        with self.db.transaction() as conn:
+            self.enqueue_in(conn, employee_id, dates)
+
+    def pending(self, limit=None):
+        """Oldest first. Returns [(employee_id, entry_date, seq)]."""
+        conn = self.db.connection()
+        cur = conn.execute("""
+            SELECT employee_id, entry_date, seq FROM sync_outbox
+            ORDER BY seq
+            LIMIT ?
+        """, (-1 if limit is None else limit,))
+        return cur.fetchall()
+
+    def count(self):
+        conn = self.db.connection()
+        return conn.execute("SELECT COUNT(*) FROM sync_outbox").fetchone()[0]
+
+    def complete(self, employee_id, spreadsheet, pending, hashes, state):
+        """
+        Drop flushed rows and record their hashes in sync_state in one
+        transaction. Rows re-queued since `pending` was read are kept.
+        pending: [(entry_date, seq)] of this employee.
+        """
+        with self.db.transaction() as conn:
+            state.mark_synced_in(conn, spreadsheet, hashes)
+            conn.executemany("""
+                DELETE FROM sync_outbox
+                WHERE employee_id=? AND entry_date=? AND seq=?
+            """, [(employee_id, d, seq) for d, seq in pending])
+
+    def record_failure(self, employee_id, pending, error):
+        with self.db.transaction() as conn:
+            conn.executemany("""
+                UPDATE sync_outbox SET attempts=attempts + 1, last_error=?
+                WHERE employee_id=? AND entry_date=?
+            """, [(error, employee_id, d) for d, _ in pending])
+
+
+# =============================================================
+# BACKGROUND FLUSHER
+# =============================================================
+# Event yang dikirim (dibaca UI dengan root.after):
+#   ("flushed", [date_str, ...])
+#   ("error", message)
+
+
+class OutboxFlusher(threading.Thread):
+
+    def __init__(self, outbox, repo, employees, state, make_client, make_payload,
+                 batch_size=62, interval=30.0, settle=2.0, max_backoff=600.0, state_key=None):
+        """
+        repo: EntryRepository (re-targeted per employee with for_employee)
+        employees: EmployeeRepository
+        make_client: callable employee -> writer with write_month(payloads)
+        make_payload: callable (employee, row) -> sheet payload dict
+        state_key: callable employee -> sync_state key (default: spreadsheet)
+        settle: seconds to wait after wake() so rapid saves share a batch
+        """
+        super().__init__(daemon=True)
+        self.outbox = outbox
+        self.repo = repo
+        self.employees = employees
+        self.state = state
+        self.make_client = make_client
+        self.make_payload = make_payload
+        self.state_key = state_key or (lambda employee: employee.spreadsheet)
+        self.batch_size = batch_size
+        self.interval = interval
+        self.settle = settle
+        self.max_backoff = max_backoff
+        self.events = queue.Queue()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+
+    def wake(self):
+        self.wakeup.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+    def flush_once(self):
+        """
+        Push one coalesced batch, one write_month per employee.
+        Returns the number of rows handled; if any employee's push failed
+        the first error is raised after the others were attempted.
+        """
+        pending = self.outbox.pending(self.batch_size)
+        if not pending:
+            return 0
+
+        by_employee = {}
+        for employee_id, d, seq in pending:
+            by_employee.setdefault(employee_id, []).append((d, seq))
+
+        error = None
+        for employee_id, items in by_employee.items():
+            try:
+                self._flush_employee(employee_id, items)
+            except Exception as e:
+                self.outbox.record_failure(employee_id, items, str(e))
+                error = error or e
+
+        if error:
+            raise error
+        return len(pending)
+
+    def _flush_employee(self, employee_id, items):
+        employee = self.employees.get(employee_id)
+        dates = [d for d, _ in items]
+        rows = self.repo.for_employee(employee_id).load_dates(dates)
+        key = self.state_key(employee)
+        pushed = self.state.load_dates(key, dates)
+
+        payloads, hashes = [], {}
+        for d in dates:
+            data = self.make_payload(employee, rows.get(d))
+            h = payload_hash(data)
+            # sudah sama dengan yang di sheet, atau dibuat lalu dihapus
+            # sebelum sempat dikirim
+            if pushed.get(d) == h or (d not in pushed and d not in rows):
+                continue
+            payloads.append((d, data))
+            hashes[d] = h
+
+        if payloads:
+            self.make_client(employee).write_month(payloads)
+
+        self.outbox.complete(employee_id, key, items, hashes, self.state)
+        if payloads:
+            self.events.put(("flushed", [d for d, _ in payloads]))
+
+    def run(self):
+        delay = 0  # langsung kirim sisa outbox dari sesi sebelumnya
+        while not self.stopped.is_set():
+            if self.wakeup.wait(delay):
+                self.wakeup.clear()
+                self.stopped.wait(self.settle)
+            if self.stopped.is_set():
+                break
+
+            try:
+                handled = self.flush_once()
+            except Exception as e:
+                traceback.print_exc()
+                self.events.put(("error", str(e)))
+                delay = min(self.max_backoff, max(self.interval, delay * 2))
+            else:
+                # masih ada sisa → lanjut tanpa menunggu
+                delay = 0 if handled >= self.batch_size else self.interval
+
+    def drain(self):
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
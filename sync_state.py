@@ -0,0 +1,76 @@
+import hashlib
+import json
+
+# =============================================================
+# SYNC STATE (DIRTY TRACKING)
+# =============================================================
+# Menyimpan hash payload terakhir yang sudah di-push per
+# (spreadsheet, tanggal). Hari yang hash-nya sama tidak perlu
+# dikirim lagi. Layout ledger memakai key "<spreadsheet>#<layout>"
+# (sheet_layout.state_key) supaya ganti layout mengirim ulang semua.
+
+
+def payload_hash(data: dict):
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class SyncStateStore:
+
+    def __init__(self, db):
+        self.db = db
+
+    def load_dates(self, spreadsheet: str, dates):
+        dates = list(dates)
+        if not dates:
+            return {}
+        conn = self.db.connection()
+        cur = conn.execute(f"""
+            SELECT entry_date, content_hash FROM sync_state
+            WHERE spreadsheet=? AND entry_date IN ({",".join("?" * len(dates))})
+        """, (spreadsheet, *dates))
+        return dict(cur.fetchall())
+
+    def load(self, spreadsheet: str, start: str, end: str):
+        """Returns {entry_date: content_hash} for start..end."""
+        conn = self.db.connection()
+        cur = conn.execute("""
+            SELECT entry_date, content_hash FROM sync_state
+            WHERE spreadsheet=? AND entry_date BETWEEN ? AND ?
+        """, (spreadsheet, start, end))
+        return dict(cur.fetchall())
+
+    def dirty(self, spreadsheet: str, payloads, has_entry):
+        """
+        Filter (date_str, data) payloads down to the ones that differ
+        from what was last pushed. Days that never had an entry and were
+        never pushed are skipped. Returns [(date_str, data, hash)].
+        """
+        payloads = list(payloads)
+        if not payloads:
+            return []
+
+        pushed = self.load(spreadsheet, payloads[0][0], payloads[-1][0])
+        out = []
+        for d, data in payloads:
+            h = payload_hash(data)
+            if d not in pushed and not has_entry(d):
+                continue
+            if pushed.get(d) != h:
+                out.append((d, data, h))
+        return out
+
+    def mark_synced_in(self, conn, spreadsheet: str, hashes: dict):
+        conn.executemany("""
+            INSERT INTO sync_state (spreadsheet, entry_date, content_hash, synced_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(spreadsheet, entry_date) DO UPDATE SET
+            content_hash=excluded.content_hash,
+            synced_at=excluded.synced_at
+        """, [(spreadsheet, d, h) for d, h in hashes.items()])
+
+    def mark_synced(self, spreadsheet: str, hashes: dict):
+        if not hashes:
+            return
+        with self.db.transaction() as conn:
+            self.mark_synced_in(conn, spreadsheet, hashes)
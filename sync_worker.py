@@ -0,0 +1,91 @@
+import queue
+import threading
+import traceback
+from collections import deque
+
+# =============================================================
+# BACKGROUND SYNC WORKER
+# =============================================================
+# run() dijalankan di thread lain (job scheduler) dan tidak boleh
+# menyentuh widget Tk. Semua progress dikirim lewat `events`
+# (queue.Queue) dan dibaca UI dengan root.after(...).
+#
+# Event yang dikirim:
+#   ("start", total)
+#   ("day", date_str, ok, error_message_or_None)
+#   ("done", ok_days, failed_days, cancelled)
+#   ("error", message)           -> gagal sebelum mulai (auth, dll)
+
+
+class SyncWorker:
+
+    def __init__(self, make_client, payloads=(), batch_size=None, retry_rounds=2):
+        """
+        make_client: callable returning a GoogleSheetSync or LedgerWriter
+                     (called in the worker)
+        payloads: list of (date_str, data) to write, in order
+        batch_size: days per GoogleSheetSync.write_month call (None = all)
+        retry_rounds: extra attempts per day after its batch failed
+        """
+        self.make_client = make_client
+        self.payloads = list(payloads)
+        self.batch_size = batch_size
+        self.retry_rounds = retry_rounds
+        self.events = queue.Queue()
+        self.cancelled = threading.Event()
+        self.report = None  # optional callable(text), e.g. Job.report
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        try:
+            gs = self.make_client()
+        except Exception as e:
+            traceback.print_exc()
+            self.events.put(("error", str(e)))
+            return
+
+        self.events.put(("start", len(self.payloads)))
+
+        ok_days, failed_days = [], []
+        size = self.batch_size or len(self.payloads) or 1
+
+        # antrian (batch, attempt). Batch yang gagal dipecah per hari
+        # dan dicoba ulang di belakang antrian sampai retry_rounds habis.
+        pending = deque(
+            (self.payloads[i:i + size], 0)
+            for i in range(0, len(self.payloads), size)
+        )
+        while pending and not self.cancelled.is_set():
+            batch, attempt = pending.popleft()
+            try:
+                gs.write_month(batch)
+            except Exception as e:
+                traceback.print_exc()
+                if len(batch) > 1:
+                    pending.extend(([p], attempt + 1) for p in batch)
+                elif attempt < self.retry_rounds:
+                    pending.append((batch, attempt + 1))
+                else:
+                    d = batch[0][0]
+                    failed_days.append(d)
+                    self.events.put(("day", d, False, str(e)))
+            else:
+                for d, _ in batch:
+                    ok_days.append(d)
+                    self.events.put(("day", d, True, None))
+
+            if self.report:
+                self.report(f"{len(ok_days) + len(failed_days)}/{len(self.payloads)} hari")
+
+        self.events.put(("done", ok_days, failed_days, self.cancelled.is_set()))
+
+    def drain(self):
+        """Return every event queued so far without blocking."""
+        out = []
+        while True:
+            try:
+                out.append(self.events.get_nowait())
+            except queue.Empty:
+                return out
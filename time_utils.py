@@ -0,0 +1,84 @@
+from functools import lru_cache
+
+# =============================================================
+# UTILITAS WAKTU
+# =============================================================
+@lru_cache(maxsize=4096)  # nilai jam sangat berulang (kelipatan 5 menit)
+def parse_minutes(t: str):
+    """'HH:MM' -> minutes since midnight, or None if blank/invalid."""
+    if not t:
+        return None
+    try:
+        h, m = map(int, t.split(":"))
+        return h * 60 + m
+    except:
+        return None
+
+
+def to_minutes(t: str):
+    m = parse_minutes(t)
+    return 0 if m is None else m
+
+
+def format_duration(minutes: int):
+    if minutes <= 0:
+        return "0 menit"
+    h = minutes // 60
+    m = minutes % 60
+    return f"{h} jam {m} menit"
+
+
+def work_minutes(jm1, js1, jm2, js2):
+    total = 0
+
+    a = to_minutes(jm1)
+    b = to_minutes(js1)
+    c = to_minutes(jm2)
+    d = to_minutes(js2)
+
+    if b > a:
+        total += (b - a)
+    if d > c:
+        total += (d - c)
+
+    return total
+
+
+def overtime_minutes(lm, ls):
+    a = to_minutes(lm)
+    b = to_minutes(ls)
+
+    if a == 0 or b == 0:
+        return 0
+
+    if b < a:
+        b += 24 * 60   # lembur lewat tengah malam
+
+    return b - a
+
+
+def calc_total_kerja(jm1, js1, jm2, js2):
+    return format_duration(work_minutes(jm1, js1, jm2, js2))
+
+
+def calc_total_lembur(lm, ls):
+    return format_duration(overtime_minutes(lm, ls))
+
+
+# kolom integer turunan di tabel entries (lihat migrasi v6)
+MINUTE_FIELDS = (
+    "jam_mulai_1_min", "jam_selesai_1_min", "jam_mulai_2_min", "jam_selesai_2_min",
+    "lembur_mulai_min", "lembur_selesai_min",
+    "work_minutes", "overtime_minutes",
+)
+
+
+def minute_columns(jm1, js1, jm2, js2, lm, ls):
+    """Values for MINUTE_FIELDS from the six 'HH:MM' strings."""
+    return (
+        parse_minutes(jm1), parse_minutes(js1),
+        parse_minutes(jm2), parse_minutes(js2),
+        parse_minutes(lm), parse_minutes(ls),
+        work_minutes(jm1, js1, jm2, js2),
+        overtime_minutes(lm, ls),
+    )
@@ -0,0 +1,229 @@
+import argparse
+import calendar
+import sys
+from datetime import date
+
+from timesheet_core import TimesheetCore
+from time_utils import format_duration
+from instrumentation import metrics
+from sheet_layout import SYNC_LAYOUTS
+from sheet_reconcile import CONFLICT, INVALID
+
+# =============================================================
+# CLI (TANPA GUI)
+# =============================================================
+# python -m timesheet [--db PATH] [--credentials FILE] [--employee ID|NAMA] <perintah>
+#
+#   export  --month 2024-05 | --from 2024-01-01 --to 2024-12-31
+#           [--layout daily|summary] FILE.xlsx
+#   sync    [--month 2024-05] [--outbox] [--layout daily|ledger_month|ledger_year]
+#   pull    --month 2024-05 [--layout ...] [--prefer-sheet] [--dry-run]
+#   import  FILE.csv|FILE.xlsx [--queue-sync] [--rejects FILE.csv]
+#   report  --from ... --to ... [--period month|quarter|year]
+#   history [--month ... | --from ... --to ...] [--limit N]  (journal perubahan)
+#
+# --sheets-dir DIR sync / pull ke file JSON lokal (tanpa Google).
+# pull keluar dengan status 1 kalau ada konflik yang belum selesai.
+# --metrics FILE.json menyimpan waktu query / API / export setelah
+# perintah selesai (format sama dengan dump jendela diagnostik).
+#
+# Exit status: 0 sukses, 1 gagal (termasuk sync sebagian / baris
+# import yang ditolak), 2 argumen salah. Tidak meng-import tkinter.
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+
+
+def parse_month(text):
+    try:
+        year, month = map(int, text.split("-"))
+        date(year, month, 1)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bulan tidak valid: {text!r} (YYYY-MM)")
+    return year, month
+
+
+def parse_date(text):
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"tanggal tidak valid: {text!r} (YYYY-MM-DD)")
+
+
+def date_range(args, parser):
+    """(start, end) from --month or --from/--to."""
+    if args.month:
+        year, month = args.month
+        return f"{year:04d}-{month:02d}-01", f"{year:04d}-{month:02d}-{calendar.monthrange(year, month)[1]:02d}"
+    if args.start and args.end:
+        if args.end < args.start:
+            parser.error("--to sebelum --from")
+        return args.start, args.end
+    parser.error("pakai --month YYYY-MM atau --from/--to")
+
+
+def add_range_args(p):
+    p.add_argument("--month", type=parse_month, help="YYYY-MM")
+    p.add_argument("--from", dest="start", type=parse_date, help="YYYY-MM-DD")
+    p.add_argument("--to", dest="end", type=parse_date, help="YYYY-MM-DD")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m timesheet", description="Timesheet tanpa GUI")
+    parser.add_argument("--db", help="file SQLite (default: TIMESHEET_DB atau timesheet.db di folder aplikasi)")
+    parser.add_argument("--credentials", help="credentials.json Google (default: TIMESHEET_CREDENTIALS "
+                                              "atau credentials.json di folder aplikasi)")
+    parser.add_argument("--employee", help="id atau nama karyawan (default: karyawan aktif di aplikasi)")
+    parser.add_argument("--metrics", help="simpan statistik waktu (JSON) ke file ini")
+    parser.add_argument("--sheets-dir", help="sync ke spreadsheet lokal (file JSON) di folder ini")
+    sub = parser.add_subparsers(dest="command", metavar="PERINTAH")
+    sub.required = True
+
+    p = sub.add_parser("export", help="export ke Excel")
+    add_range_args(p)
+    p.add_argument("--layout", choices=("daily", "summary"), default="daily")
+    p.add_argument("path", help="file .xlsx tujuan")
+
+    p = sub.add_parser("sync", help="kirim ke Google Sheet")
+    p.add_argument("--month", type=parse_month, help="sync satu bulan (YYYY-MM)")
+    p.add_argument("--outbox", action="store_true", help="kirim semua perubahan yang menunggu di outbox")
+    p.add_argument("--layout", choices=SYNC_LAYOUTS,
+                   help="layout sheet untuk --month (default: setting aplikasi)")
+
+    p = sub.add_parser("pull", help="tarik perubahan dari Google Sheet satu bulan")
+    p.add_argument("--month", type=parse_month, required=True, help="YYYY-MM")
+    p.add_argument("--layout", choices=SYNC_LAYOUTS, help="layout sheet (default: setting aplikasi)")
+    p.add_argument("--prefer-sheet", action="store_true", help="konflik diselesaikan dengan isi sheet")
+    p.add_argument("--dry-run", action="store_true", help="hanya laporkan, tidak mengubah database")
+
+    p = sub.add_parser("import", help="import CSV / XLSX")
+    p.add_argument("path")
+    p.add_argument("--queue-sync", action="store_true", help="antrekan hari yang diimpor untuk auto sync")
+    p.add_argument("--rejects", help="file CSV baris yang ditolak (default: <file>.rejected.csv)")
+
+    p = sub.add_parser("report", help="total kerja & lembur")
+    add_range_args(p)
+    p.add_argument("--period", choices=("month", "quarter", "year"), default="month")
+
+    p = sub.add_parser("history", help="riwayat perubahan (audit)")
+    add_range_args(p)
+    p.add_argument("--limit", type=int, default=50)
+    return parser
+
+
+# =============================================================
+# PERINTAH
+# =============================================================
+def cmd_export(core, employee, args, parser):
+    start, end = date_range(args, parser)
+    n = core.export(employee, args.path, start, end, args.layout)
+    print(f"{n} hari diekspor ke {args.path}")
+    return EXIT_OK
+
+
+def cmd_sync(core, employee, args, parser):
+    if not args.month and not args.outbox:
+        parser.error("pakai --month YYYY-MM dan/atau --outbox")
+    if not core.has_credentials():
+        print(f"error: credentials tidak ditemukan: {core.credentials_path}", file=sys.stderr)
+        return EXIT_FAILED
+
+    status = EXIT_OK
+    if args.outbox:
+        print(f"outbox: {core.flush_outbox()} hari diproses")
+    if args.month:
+        year, month = args.month
+        ok_days, failed_days = core.sync_month(employee, year, month, layout=args.layout)
+        print(f"sync {year}-{month:02d} ({employee.spreadsheet}): "
+              f"{len(ok_days)} hari berhasil, {len(failed_days)} gagal")
+        for d in failed_days:
+            print(f"  gagal: {d}", file=sys.stderr)
+        if failed_days:
+            status = EXIT_FAILED
+    return status
+
+
+def cmd_pull(core, employee, args, parser):
+    if not core.has_credentials():
+        print(f"error: credentials tidak ditemukan: {core.credentials_path}", file=sys.stderr)
+        return EXIT_FAILED
+    year, month = args.month
+    report = core.pull_month(
+        employee, year, month, args.layout,
+        prefer_sheet=args.prefer_sheet, apply=not args.dry_run,
+    )
+    print(report.summary())
+    unresolved = report.dates(INVALID) + ([] if args.prefer_sheet else report.dates(CONFLICT))
+    return EXIT_FAILED if unresolved else EXIT_OK
+
+
+def cmd_import(core, employee, args, parser):
+    report = core.import_file(
+        employee, args.path, rejects_path=args.rejects, run_hooks=args.queue_sync,
+        progress=lambda n: print(f"\r{n} baris", end="", file=sys.stderr, flush=True),
+    )
+    print(file=sys.stderr)
+    print(report.summary())
+    return EXIT_FAILED if report.rejected else EXIT_OK
+
+
+def cmd_report(core, employee, args, parser):
+    start, end = date_range(args, parser)
+    print(f"{'Periode':<10} {'Hari':>5}  {'Total Kerja':<20} Total Lembur")
+    for key, days, work, overtime in core.totals(employee, start, end, args.period):
+        print(f"{key:<10} {days:>5}  {format_duration(work):<20} {format_duration(overtime)}")
+    return EXIT_OK
+
+
+def cmd_history(core, employee, args, parser):
+    if args.month or args.start or args.end:
+        start, end = date_range(args, parser)
+    else:
+        start, end = "0000-00-00", "9999-99-99"
+    for e in core.journal.history(employee.id, start, end, args.limit):
+        ref = f" #{e.ref}" if e.ref else ""
+        fields = sorted(set(e.before or {}) | set(e.after or {}))
+        changes = ", ".join(
+            f"{f}: {(e.before or {}).get(f, '')!r} -> {(e.after or {}).get(f, '')!r}" for f in fields
+        )
+        print(f"#{e.id} {e.changed_at} {e.entry_date} {e.action}{ref}  {changes}")
+    return EXIT_OK
+
+
+COMMANDS = {
+    "export": cmd_export,
+    "sync": cmd_sync,
+    "pull": cmd_pull,
+    "import": cmd_import,
+    "report": cmd_report,
+    "history": cmd_history,
+}
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    core = None
+    try:
+        core = TimesheetCore(args.db, credentials_path=args.credentials, sheets_dir=args.sheets_dir)
+        employee = core.find_employee(args.employee)
+        return COMMANDS[args.command](core, employee, args, parser)
+    except KeyboardInterrupt:
+        return EXIT_FAILED
+    except Exception as e:
+        print(f"error: {e}", file=sys.stderr)
+        return EXIT_FAILED
+    finally:
+        if core is not None:
+            core.close()
+        if args.metrics:
+            try:
+                metrics.dump(args.metrics)
+            except OSError as e:
+                print(f"error: {e}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,390 @@
+import os
+import sys
+import threading
+
+from db_connection import Database, default_db_path, app_dir
+from db_migrations import migrate, DEFAULT_EMPLOYEE_ID
+from entry_repository import EntryRepository, EmployeeRepository
+from sync_state import SyncStateStore, payload_hash
+from sync_outbox import SyncOutbox, OutboxFlusher
+from sync_worker import SyncWorker
+from app_settings import SettingsStore
+from change_journal import ChangeJournal
+from month_cache import MonthCache, DEFAULT_MONTH_CACHE_SIZE
+from time_utils import format_duration, calc_total_kerja, calc_total_lembur
+from duration_batch import durations_for_rows
+from instrumentation import metrics
+from sheet_layout import SYNC_DAILY, SYNC_LAYOUTS, LedgerWriter, state_key
+from sheet_reconcile import reconcile, SHEET_NEWER, CONFLICT
+
+# =============================================================
+# TIMESHEET CORE (TANPA GUI)
+# =============================================================
+# Data, export, import dan sync yang dipakai bersama oleh GUI
+# (main.py) dan CLI (python -m timesheet). Modul ini tidak boleh
+# meng-import tkinter; gspread / openpyxl baru di-import saat
+# sync / export / import benar-benar dipakai.
+
+
+# =============================================================
+# RESOURCE PATH (FOR PYINSTALLER)
+# =============================================================
+def resource_path(relative_path):
+    """
+    Get absolute path to resource, works for dev and for PyInstaller exe
+    """
+    try:
+        base_path = sys._MEIPASS  # PyInstaller temp folder
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+CREDENTIALS_FILENAME = "credentials.json"
+CREDENTIALS_ENV = "TIMESHEET_CREDENTIALS"
+
+
+def default_credentials_path():
+    """
+    $TIMESHEET_CREDENTIALS if set, else credentials.json bundled in the exe
+    (PyInstaller) or next to the source files; always absolute, so it does
+    not depend on the working directory (cron, shortcuts).
+    """
+    path = os.environ.get(CREDENTIALS_ENV)
+    if not path:
+        if getattr(sys, "frozen", False):
+            path = resource_path(CREDENTIALS_FILENAME)
+        else:
+            path = os.path.join(app_dir(), CREDENTIALS_FILENAME)
+    return os.path.abspath(os.path.expanduser(path))
+
+
+SHEET_NAME = "AI META Timesheet"
+SHEETS_DIR_ENV = "TIMESHEET_SHEETS_DIR"  # sync ke file lokal, bukan Google
+
+
+# =============================================================
+# PAYLOAD GOOGLE SHEET
+# =============================================================
+def sync_payload(row, nama, work=None, overtime=None):
+    # work/overtime: menit yang sudah dihitung batch (opsional)
+    if row:
+        jm1, js1, jm2, js2, lm, ls, alasan, desk, note = row
+        if work is None:
+            tkerja  = calc_total_kerja(jm1, js1, jm2, js2)
+            tlembur = calc_total_lembur(lm, ls)
+        else:
+            tkerja  = format_duration(work)
+            tlembur = format_duration(overtime)
+    else:
+        jm1 = js1 = jm2 = js2 = lm = ls = alasan = desk = note = ""
+        tkerja = ""
+        tlembur = ""
+
+    return {
+        "nama": nama,
+        "jam_mulai_1": jm1,
+        "jam_selesai_1": js1,
+        "jam_mulai_2": jm2,
+        "jam_selesai_2": js2,
+        "total_kerja": tkerja,
+        "lembur_mulai": lm,
+        "lembur_selesai": ls,
+        "total_lembur": tlembur,
+        "alasan_lembur": alasan,
+        "deskripsi_lembur": desk,
+        "catatan": note,
+    }
+
+
+def month_payloads(model, nama):
+    pairs = list(model)
+    work, overtime = durations_for_rows([row for _, row in pairs])
+    return [
+        (d, sync_payload(row, nama, int(w), int(o)))
+        for (d, row), w, o in zip(pairs, work, overtime)
+    ]
+
+
+# =============================================================
+# CORE
+# =============================================================
+class TimesheetCore:
+
+    def __init__(self, db_path=None, credentials_path=None, sheets_dir=None):
+        """
+        db_path: None = default_db_path() (TIMESHEET_DB or next to the app)
+        credentials_path: None = default_credentials_path()
+                          (TIMESHEET_CREDENTIALS or next to the app)
+        sheets_dir: sync to LocalSheetSync JSON files in this folder instead
+                    of Google Sheets (default: $TIMESHEET_SHEETS_DIR)
+        """
+        self.db = Database(db_path or default_db_path())
+        migrate(self.db.connection())
+        self.credentials_path = credentials_path or default_credentials_path()
+        self.sheets_dir = sheets_dir or os.environ.get(SHEETS_DIR_ENV) or None
+
+        self.settings = SettingsStore(self.db)
+        self.outbox = SyncOutbox(self.db)
+        self.sync_state = SyncStateStore(self.db)
+        self.employees = EmployeeRepository(self.db)
+        self.journal = ChangeJournal(self.db)
+        self.month_cache = MonthCache(self.setting_int("month_cache_size", DEFAULT_MONTH_CACHE_SIZE))
+
+        self._sheets = {}  # spreadsheet name -> SheetBackend
+        self._limiters = []  # RateLimiter setiap GoogleSheetSync, juga yang masih connect
+        self._sheets_stopped = False
+        self._sheets_lock = threading.Lock()
+
+    def close(self):
+        self.db.close_all()
+
+    def setting_int(self, key, default):
+        try:
+            return int(self.settings.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    # =========================================================
+    # KARYAWAN
+    # =========================================================
+    def current_employee(self):
+        return (
+            self.employees.get(self.settings.get("current_employee", DEFAULT_EMPLOYEE_ID))
+            or self.employees.get(DEFAULT_EMPLOYEE_ID)
+        )
+
+    def find_employee(self, ref=None):
+        """None = current employee; otherwise an id or a (case-insensitive) name."""
+        if ref is None:
+            return self.current_employee()
+        ref = str(ref).strip()
+        if ref.isdigit():
+            employee = self.employees.get(int(ref))
+        else:
+            employee = next(
+                (e for e in self.employees.list() if e.name.lower() == ref.lower()), None
+            )
+        if employee is None:
+            raise ValueError(f"Karyawan tidak ditemukan: {ref}")
+        return employee
+
+    def repo(self, employee):
+        return self.repo_for(employee.id)
+
+    def repo_for(self, employee_id):
+        return EntryRepository(
+            self.db, write_hooks=[self.outbox.enqueue_in],
+            employee_id=employee_id, cache=self.month_cache, journal=self.journal,
+        )
+
+    # =========================================================
+    # UNDO / REDO (ENTRY JOURNAL)
+    # =========================================================
+    def undo(self, journal_id):
+        """Revert a journaled change. Returns (JournalEntry, new journal id or None)."""
+        entry = self.journal.get(journal_id)
+        return entry, self.repo_for(entry.employee_id).revert(entry)
+
+    def redo(self, journal_id):
+        """Apply a reverted change again. Returns (JournalEntry, new journal id or None)."""
+        entry = self.journal.get(journal_id)
+        return entry, self.repo_for(entry.employee_id).reapply(entry)
+
+    # =========================================================
+    # GOOGLE SHEET
+    # =========================================================
+    def has_credentials(self):
+        """True when a sync target is configured (credentials or sheets_dir)."""
+        return bool(self.sheets_dir) or os.path.exists(self.credentials_path)
+
+    def sheet_sync(self, employee):
+        """The employee's SheetBackend (GoogleSheetSync or LocalSheetSync)."""
+        # dipanggil dari worker thread; auth hanya sekali per proses.
+        # Lock hanya untuk dict-nya: auth / buka spreadsheet (jaringan,
+        # retry) di luar lock supaya stop_sheets di thread Tk tidak menunggu
+        name = employee.spreadsheet
+        with self._sheets_lock:
+            gs = self._sheets.get(name)
+        if gs is not None:
+            return gs
+
+        if self.sheets_dir:
+            from sheet_backend import LocalSheetSync
+            os.makedirs(self.sheets_dir, exist_ok=True)
+            gs = LocalSheetSync(os.path.join(self.sheets_dir, f"{name}.json"), name)
+        else:
+            from google_sheet_sync import GoogleSheetSync
+            from rate_limiter import RateLimiter
+            limiter = RateLimiter.for_sheets()
+            with self._sheets_lock:
+                self._limiters.append(limiter)
+                if self._sheets_stopped:
+                    limiter.stop()
+            # buka by key kalau sudah pernah ketemu (tanpa Drive search)
+            setting = f"spreadsheet_key:{name}"
+            key = self.settings.get(setting)
+            gs = GoogleSheetSync(self.credentials_path, name, limiter=limiter, spreadsheet_key=key)
+            if gs.key != key:
+                self.settings.set(setting, gs.key)
+
+        with self._sheets_lock:
+            # thread lain bisa lebih dulu selesai membuka; pakai yang pertama
+            return self._sheets.setdefault(name, gs)
+
+    def stop_sheets(self):
+        """App closing: Sheets calls still running (or connecting) stop retrying / backing off."""
+        with self._sheets_lock:
+            self._sheets_stopped = True
+            limiters = list(self._limiters)
+        for limiter in limiters:
+            limiter.stop()
+
+    def sync_layout(self):
+        """Sheet layout for sync: SYNC_DAILY or a ledger layout (setting)."""
+        layout = self.settings.get("sync_layout", SYNC_DAILY)
+        return layout if layout in SYNC_LAYOUTS else SYNC_DAILY
+
+    def set_sync_layout(self, layout):
+        if layout not in SYNC_LAYOUTS:
+            raise ValueError(f"Layout sync tidak dikenal: {layout}")
+        self.settings.set("sync_layout", layout)
+
+    def sync_key(self, employee, layout=None):
+        # file lokal punya status sync sendiri, terpisah dari Google
+        name = f"local:{employee.spreadsheet}" if self.sheets_dir else employee.spreadsheet
+        return state_key(name, layout or self.sync_layout())
+
+    def sheet_writer(self, employee, layout=None):
+        """Object with write_month(payloads) for the employee's spreadsheet."""
+        gs = self.sheet_sync(employee)
+        layout = layout or self.sync_layout()
+        return gs if layout == SYNC_DAILY else LedgerWriter(gs, layout)
+
+    def prepare_sync(self, worker, employee, year, month, layout=None):
+        """
+        Fill a SyncWorker with the month's changed days and point it at the
+        writer for `layout` (None = sync_layout()). Returns the day count.
+        """
+        layout = layout or self.sync_layout()
+        worker.make_client = lambda: self.sheet_writer(employee, layout)
+        worker.state_key = self.sync_key(employee, layout)
+        with metrics.timed("sync", "prepare month"):
+            model = self.repo(employee).load_month(year, month)
+            dirty = self.sync_state.dirty(
+                worker.state_key,
+                month_payloads(model, employee.name),
+                has_entry=model.__contains__,
+            )
+        worker.payloads = [(d, data) for d, data, _ in dirty]
+        worker.hashes = {d: h for d, _, h in dirty}
+        return len(dirty)
+
+    def finish_sync(self, employee, worker, ok_days):
+        self.sync_state.mark_synced(
+            worker.state_key, {d: worker.hashes[d] for d in ok_days}
+        )
+
+    def sync_month(self, employee, year, month, progress=None, layout=None):
+        """
+        Push the month's changed days and wait for the result.
+        Returns (ok_days, failed_days); raises RuntimeError if the sync
+        could not start (auth, spreadsheet not found, ...).
+        """
+        worker = SyncWorker(None)
+        worker.report = progress
+        self.prepare_sync(worker, employee, year, month, layout)
+        worker.run()
+
+        for event in worker.drain():
+            if event[0] == "error":
+                raise RuntimeError(event[1])
+            if event[0] == "done":
+                _, ok_days, failed_days, _ = event
+                self.finish_sync(employee, worker, ok_days)
+                return ok_days, failed_days
+        return [], []
+
+    def pull_month(self, employee, year, month, layout=None, prefer_sheet=False, apply=True):
+        """
+        Read the month back from the sheet (one request), diff it against
+        SQLite and take over the days edited only in the sheet (plus the
+        conflicts if prefer_sheet). apply=False only reports.
+        Returns a sheet_reconcile.ReconcileReport.
+        """
+        layout = layout or self.sync_layout()
+        key = self.sync_key(employee, layout)
+        repo = self.repo(employee)
+        with metrics.timed("sync", "pull month"):
+            model = repo.load_month(year, month)
+            remote = self.sheet_sync(employee).read_month(model.days, layout)
+            pushed = self.sync_state.load(key, model.days[0], model.days[-1])
+            report = reconcile(
+                dict(model), remote, pushed,
+                lambda row: sync_payload(row, employee.name),
+            )
+        if not apply:
+            return report
+
+        take = report.dates(SHEET_NEWER) + (report.dates(CONFLICT) if prefer_sheet else [])
+        # tanpa write hook: isi sheet sudah sama, tidak perlu dikirim ulang
+        repo.save_many([(d, report.sheet[d]) for d in take if report.sheet[d]], run_hooks=False)
+        for d in take:
+            if report.sheet[d] is None:
+                repo.delete(d, run_hooks=False)
+        self.sync_state.mark_synced(key, {d: report.hashes[d] for d in take})
+        report.applied = take
+        return report
+
+    def outbox_flusher(self, **kw):
+        return OutboxFlusher(
+            self.outbox, self.repo(self.current_employee()), self.employees, self.sync_state,
+            self.sheet_writer,
+            lambda employee, row: sync_payload(row, employee.name),
+            state_key=self.sync_key,
+            **kw
+        )
+
+    def write_daily_sheets(self, employee, dates):
+        """
+        Write the per-day template sheets for `dates` now, whatever the
+        sync layout (on-demand copy for people who need that layout).
+        Returns the number of sheets written.
+        """
+        rows = self.repo(employee).load_dates(dates)
+        payloads = [(d, sync_payload(rows.get(d), employee.name)) for d in sorted(dates)]
+        self.sheet_sync(employee).write_month(payloads)
+        self.sync_state.mark_synced(
+            self.sync_key(employee, SYNC_DAILY),
+            {d: payload_hash(data) for d, data in payloads},
+        )
+        return len(payloads)
+
+    def flush_outbox(self):
+        """Push the whole outbox now (blocking). Returns rows handled."""
+        flusher = self.outbox_flusher()
+        total = 0
+        while True:
+            handled = flusher.flush_once()
+            total += handled
+            if handled < flusher.batch_size:
+                return total
+
+    # =========================================================
+    # EXPORT / IMPORT / LAPORAN
+    # =========================================================
+    def export(self, employee, path, start, end, layout="daily", progress=None, cancelled=None):
+        """Returns the number of days written (see excel_export.export_range)."""
+        from excel_export import export_range
+        return export_range(
+            path, self.repo(employee), start, end, layout,
+            progress=progress, nama=employee.name, cancelled=cancelled,
+        )
+
+    def import_file(self, employee, path, **kw):
+        """Returns an ImportReport (see bulk_import.import_file)."""
+        from bulk_import import import_file
+        return import_file(path, self.repo(employee), **kw)
+
+    def totals(self, employee, start, end, period="month"):
+        return self.repo(employee).totals(start, end, period)